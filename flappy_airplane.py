@@ -1,16 +1,60 @@
+import time
+
+LAUNCH_TIME = time.perf_counter()  # For the time-to-first-frame and --startup-profile reports
+
+import argparse
+import hashlib
+import math
+import os
 import pygame
 import random
+import struct
 import sys
+import threading
+from collections import OrderedDict, deque
+
+import flappy_core
+from flappy_core import (
+    SCREEN_WIDTH, SCREEN_HEIGHT, GRAVITY, FLAP_STRENGTH, INITIAL_PIPE_GAP, MIN_PIPE_GAP,
+    PIPE_WIDTH, INITIAL_PIPE_VELOCITY, MAX_PIPE_VELOCITY, INITIAL_SPAWN_TIME, MIN_SPAWN_TIME,
+    TICK_RATE, AirplaneBody, ObjectPool, PipeBody, Rules, Simulation,
+)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 # OPEN SOURCE DO WHATEVER U WANT TO DO HERE
 
-# Initialize Pygame
-pygame.init()
+# Startup phases as (name, perf_counter) marks, reported by --startup-profile
+startup_marks = [("launch", LAUNCH_TIME)]
+
+
+def mark_startup(phase):
+    startup_marks.append((phase, time.perf_counter()))
+
+
+def print_startup_profile():
+    print("[INFO] Startup profile (ms):")
+    for (_, previous), (phase, mark) in zip(startup_marks, startup_marks[1:]):
+        print(f"  {phase:<22} {(mark - previous) * 1000:7.1f}")
+    print(f"  {'total':<22} {(startup_marks[-1][1] - LAUNCH_TIME) * 1000:7.1f}")
+
+
+def get_ticks():
+    """Milliseconds since launch (pygame.time.get_ticks needs the full pygame.init)"""
+    return int((time.perf_counter() - LAUNCH_TIME) * 1000)
+
+
+mark_startup("imports")
 
 # Constants
-SCREEN_WIDTH = 600
-SCREEN_HEIGHT = 800
-FPS = 60
+FPS = 60  # Render frame cap (0 = uncapped); physics always runs at TICK_RATE
+TICK_MS = 1000 / TICK_RATE
+MAX_FRAME_TIME = 250  # ms of simulation caught up after a stall, at most
+HIGHSCORE_REPLAY = 'highscore.flr'  # Recording of the run that set the high score
+DIFFICULTY_FILE = 'difficulty.json'  # Optional tuned difficulty curves (see flappy_core.DEFAULT_DIFFICULTY)
 
 # Colors
 WHITE = (255, 255, 255)
@@ -30,16 +74,51 @@ SUNSET_SKY = (255, 140, 100)   # Orange-pink
 NIGHT_SKY = (25, 25, 60)       # Dark blue
 DAWN_SKY = (255, 180, 150)     # Light orange-pink
 
-# Game variables
-GRAVITY = 0.5
-FLAP_STRENGTH = -7  # Reduced from -10 for better control
-INITIAL_PIPE_GAP = 320  # Starting gap size - Very easy at start
-MIN_PIPE_GAP = 200  # Minimum gap at high scores - Still playable
-PIPE_WIDTH = 70
-INITIAL_PIPE_VELOCITY = 2  # Slower initial speed
-MAX_PIPE_VELOCITY = 8  # Maximum speed at high scores
-INITIAL_SPAWN_TIME = 1800  # Starting spawn time
-MIN_SPAWN_TIME = 1000  # Minimum spawn time at high scores
+# Assets
+ASSET_CACHE_DIR = '.asset_cache'  # Decoded, pre-scaled images (safe to delete)
+ASSET_CACHE_SIZES = 4  # Window-scale sizes of each image kept on disk (most recently used)
+AIRPLANE_IMAGE_FILES = ['airplane.png', 'plane.png']
+AIRPLANE_IMAGE_SIZE = (50, 30)
+
+# Rendering caches
+ROTATION_STEP = 3  # Degrees between cached falling-pipe frames
+FALL_FRAME_WARM_BUDGET = 4  # Falling-pipe frames pre-rendered per game frame
+MENU_IDLE_TIMEOUT = 500  # ms a menu waits for input before waking up
+NIGHT_ALPHA_BUCKETS = 64  # Opacity levels pre-rendered for stars and moon (256 = exact)
+MASK_CACHE_SIZE = 256  # Collision masks kept for precise collision
+PIPE_POOL_SIZE = 16  # Pipes built up front: a full screen, plus the autopilot's scratch copies
+
+# Particles
+PARTICLE_CAPACITY = 4096  # Max live particles in the NumPy particle system
+PARTICLE_LIFE = 60  # frames
+PARTICLE_COLORS = [RED, ORANGE, YELLOW, DARK_RED]
+
+# Profiler overlay
+PROFILER_PHASES = ["events", "update", "sky", "pipes", "airplane", "particles", "hud", "overlay", "flip", "wait"]
+PROFILER_DRAW_PHASES = ["sky", "pipes", "airplane", "particles", "hud"]  # Sub-phases of draw_game_screen
+PROFILER_WINDOW = 120  # Frames in the rolling p50/p95/max
+PROFILER_HISTORY = 3600  # Frames kept for CSV dumps (1 minute at 60 FPS)
+PROFILER_REFRESH = 15  # Frames between overlay text updates
+
+# Night sky layout
+STAR_POSITIONS = [
+    (100, 80), (180, 120), (280, 90), (380, 110), (480, 70),
+    (150, 180), (320, 160), (450, 200), (220, 240), (520, 150),
+    (80, 300), (200, 350), (350, 320), (500, 380), (140, 420),
+    (420, 280), (560, 240), (90, 500), (300, 480), (470, 520)
+]
+MOON_X = 480
+MOON_Y = 120
+MOON_RADIUS = 35
+
+# Audio
+CRASH_SOUND_FILES = [f"{name}{ext}" for name in ('crash sound', 'crash') for ext in ('.mp3', '.wav', '.ogg')]
+MUSIC_EXTENSIONS = ['.mp3', '.ogg', '.wav']
+AUDIO_READY_EVENT = pygame.USEREVENT + 1  # Posted by the audio loader to wake idle menus
+SFX_VOLUME = 0.3
+SFX_CHANNELS = 4  # Mixer channels reserved for sound effects
+SFX_PRIORITIES = {"crash": 3, "score": 2, "flap": 1}  # Higher may cut off lower
+SFX_VOICE_LIMITS = {"crash": 1, "score": 2, "flap": 2}  # Max voices playing at once per category
 
 # Game States
 HOME = 0
@@ -47,17 +126,571 @@ PLAYING = 1
 SETTINGS = 2
 MODDING = 3
 GAME_OVER = 4
+STATE_NAMES = {HOME: "home", PLAYING: "playing", SETTINGS: "settings", MODDING: "modding", GAME_OVER: "game_over"}
+
+
+class SpriteCache:
+    """LRU cache of scaled, flipped and rotated sprite surfaces.
+    
+    Sizes are in layout units; the output scale is part of every key, so
+    each window size gets sprites rasterized at its own resolution.
+    """
+    def __init__(self, max_size=128, max_rotated=256, rotation_step=ROTATION_STEP):
+        self.max_size = max_size
+        self.max_rotated = max_rotated
+        self.rotation_step = rotation_step
+        self.surfaces = OrderedDict()
+        self.rotated = OrderedDict()
+        self.loaders = {}  # image -> load(width, height) from its source file
+        self.sources = {}  # (image, scale) -> image re-rasterized for that output scale
+        self.hits = 0
+        self.misses = 0
+        
+    def add_source(self, image, load):
+        """Register load(width, height) to re-rasterize image's source file at other output scales"""
+        self.loaders[image] = load
+        
+    def source(self, image, scale):
+        """image as drawn at the given output scale (the image itself at 1)"""
+        if scale == 1:
+            return image
+        key = (image, scale)
+        surface = self.sources.get(key)
+        if surface is None:
+            width, height = image.get_size()
+            size = (max(1, round(width * scale)), max(1, round(height * scale)))
+            load = self.loaders.get(image)
+            try:
+                surface = load(*size) if load is not None else None
+            except (pygame.error, OSError):
+                surface = None
+            if surface is None:
+                surface = pygame.transform.smoothscale(image, size)
+            self.sources[key] = surface
+        return surface
+        
+    def get(self, image, width, height, flipped=False, scale=1):
+        """Return image scaled to (width, height) layout units, building it on first use.
+        
+        At an output scale other than 1 the sprite is width * scale pixels
+        wide, scaled from the source re-rasterized for that scale. An image
+        of None gives the drawn fallback pipe body.
+        """
+        key = (image, width, height, flipped, scale)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+        
+        self.misses += 1
+        height = max(0, height)
+        size = (round(width * scale), round(height * scale))
+        if image is None:
+            surface = pygame.Surface(size, pygame.SRCALPHA)
+            pygame.draw.rect(surface, GREEN, (0, 0, *size))
+            pygame.draw.rect(surface, DARK_GREEN, (0, 0, *size), max(1, round(3 * scale)))
+        else:
+            image = self.source(image, scale)
+            if flipped:
+                image = pygame.transform.flip(image, False, True)
+            surface = pygame.transform.scale(image, size)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)  # Evict least recently used
+        return surface
+        
+    def quantize_angle(self, angle):
+        """Snap an angle to the nearest cached rotation frame"""
+        return round(angle / self.rotation_step) * self.rotation_step % 360
+        
+    def has_rotated(self, image, width, height, angle, flipped=False, scale=1):
+        return (image, width, height, flipped, self.quantize_angle(angle), scale) in self.rotated
+        
+    def get_rotated(self, image, width, height, angle, flipped=False, scale=1):
+        """Return the scaled sprite rotated to the quantized angle"""
+        angle = self.quantize_angle(angle)
+        key = (image, width, height, flipped, angle, scale)
+        surface = self.rotated.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.rotated.move_to_end(key)
+            return surface
+        
+        self.misses += 1
+        surface = pygame.transform.rotate(self.get(image, width, height, flipped, scale), angle)
+        self.rotated[key] = surface
+        while len(self.rotated) > self.rotated_capacity(scale):
+            self.rotated.popitem(last=False)
+        return surface
+        
+    def rotated_capacity(self, scale=1):
+        """Rotated frames kept at an output scale.
+        
+        Larger frames share the pixel budget of max_rotated frames at scale
+        1, but one pipe's whole fall (top and bottom) always fits.
+        """
+        return max(2 * FALL_FRAMES, int(self.max_rotated / max(1, scale) ** 2))
+        
+    def clear(self):
+        """Drop all cached surfaces (e.g. when PIPE_WIDTH changes)"""
+        self.surfaces.clear()
+        self.rotated.clear()
+        self.sources.clear()
+        
+    def keep_scale(self, scale):
+        """Drop surfaces rendered for output scales other than scale (scale 1 stays for collision masks)"""
+        for cache in (self.surfaces, self.rotated):
+            for key in [key for key in cache if key[-1] not in (1, scale)]:
+                del cache[key]
+        self.sources = {key: surface for key, surface in self.sources.items() if key[1] == scale}
+        
+    def stats(self):
+        return {"size": len(self.surfaces), "rotated": len(self.rotated),
+                "hits": self.hits, "misses": self.misses}
+
+
+class MaskCache:
+    """LRU cache of collision masks for the sprites in a SpriteCache.
+    
+    Masks share the sprite cache's keys (plus the quantized angle), so each
+    scaled or rotated frame is scanned for opaque pixels only once.
+    """
+    def __init__(self, sprites, max_size=MASK_CACHE_SIZE):
+        self.sprites = sprites
+        self.max_size = max_size
+        self.masks = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        
+    def get(self, image, width, height, flipped=False, angle=0):
+        """Mask of the sprite SpriteCache.get/get_rotated would draw"""
+        angle = self.sprites.quantize_angle(angle)
+        key = (image, width, height, flipped, angle)
+        mask = self.masks.get(key)
+        if mask is not None:
+            self.hits += 1
+            self.masks.move_to_end(key)
+            return mask
+        
+        self.misses += 1
+        if angle:
+            surface = self.sprites.get_rotated(image, width, height, angle, flipped)
+        else:
+            surface = self.sprites.get(image, width, height, flipped)
+        mask = pygame.mask.from_surface(surface)
+        self.masks[key] = mask
+        if len(self.masks) > self.max_size:
+            self.masks.popitem(last=False)
+        return mask
+        
+    def clear(self):
+        self.masks.clear()
+        
+    def stats(self):
+        return {"size": len(self.masks), "hits": self.hits, "misses": self.misses}
+
+
+# A falling pipe is fully below the screen once it has dropped this far
+FALL_OFFSCREEN_OFFSET = SCREEN_HEIGHT + 50
+
+
+class AssetCache:
+    """Decoded, pre-scaled images kept on disk between launches.
+
+    An entry is keyed by the source file's path, size and mtime plus the
+    target size, so editing an image invalidates it. Entries hold a small
+    header and raw RGBA pixels, read back with one bulk read instead of
+    decoding and scaling the full-size PNG. Sizes made for one window scale
+    (scaled=True) are pruned to the ASSET_CACHE_SIZES most recently used,
+    so resizing the window through many scales does not pile up files.
+    """
+    HEADER = struct.Struct("<4sII")  # magic, width, height
+    MAGIC = b"FLIM"
+    
+    def __init__(self, directory=ASSET_CACHE_DIR, max_sizes=ASSET_CACHE_SIZES):
+        self.directory = directory
+        self.max_sizes = max_sizes
+        self.hits = 0
+        self.misses = 0
+        
+    def entry_prefix(self, path):
+        """Shared by every entry made from any version of the file at path"""
+        return os.path.basename(path).replace('.', '_') + '-'
+        
+    def version_prefix(self, path):
+        """Shared by every size made from the current version of the file at path"""
+        stat = os.stat(path)
+        key = f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}"
+        digest = hashlib.sha1(key.encode()).hexdigest()[:16]
+        return f"{self.entry_prefix(path)}{digest}-"
+        
+    def entry_path(self, path, width, height, scaled=False):
+        size = f"{width}x{height if height is not None else 'auto'}"
+        kind = ".scaled" if scaled else ""
+        return os.path.join(self.directory, f"{self.version_prefix(path)}{size}{kind}.rgba")
+        
+    def load_scaled(self, path, width, height=None, scaled=False):
+        """Image at path scaled to width x height (height None keeps the aspect ratio).
+        
+        scaled marks a size made for the current window scale rather than
+        the layout size; only a few of those are kept on disk.
+        """
+        entry = self.entry_path(path, width, height, scaled)
+        try:
+            with open(entry, 'rb') as f:
+                data = f.read()
+            magic, entry_width, entry_height = self.HEADER.unpack_from(data)
+            if magic == self.MAGIC and len(data) == self.HEADER.size + entry_width * entry_height * 4:
+                self.hits += 1
+                try:
+                    os.utime(entry)  # Mark as recently used for prune()
+                except OSError:
+                    pass
+                pixels = memoryview(data)[self.HEADER.size:]
+                return pygame.image.frombuffer(pixels, (entry_width, entry_height), "RGBA").convert_alpha()
+        except (OSError, struct.error):
+            pass
+        
+        self.misses += 1
+        img = pygame.image.load(path).convert_alpha()
+        if height is None:
+            height = int(width * img.get_height() / img.get_width())
+        image = pygame.transform.scale(img, (width, height))
+        self.store(path, entry, image)
+        return image
+        
+    def store(self, path, entry, image):
+        width, height = image.get_size()
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            self.prune(path, os.path.basename(entry))
+            temp_path = f"{entry}.tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(self.HEADER.pack(self.MAGIC, width, height))
+                f.write(pygame.image.tobytes(image, "RGBA"))
+            os.replace(temp_path, entry)
+        except OSError as e:
+            print(f"[WARNING] Could not cache {path}: {e}")
+            
+    def prune(self, path, keep):
+        """Make room for entry keep: drop older versions of the file and its least recently used scaled sizes"""
+        version = self.version_prefix(path)
+        sizes = []
+        for name in os.listdir(self.directory):
+            if not name.startswith(self.entry_prefix(path)) or name == keep:
+                continue
+            entry = os.path.join(self.directory, name)
+            if not name.startswith(version):
+                os.remove(entry)
+            elif name.endswith('.scaled.rgba'):
+                sizes.append((os.path.getmtime(entry), entry))
+        sizes.sort(reverse=True)
+        for _, entry in sizes[self.max_sizes - 1:]:
+            os.remove(entry)
+
+
+asset_cache = AssetCache()
+
+
+def fall_frame_count():
+    """Number of frames a falling pipe takes to drop below the screen"""
+    frames = 0
+    speed = 0
+    offset = 0
+    while offset <= FALL_OFFSCREEN_OFFSET:
+        speed += 0.5
+        offset += speed
+        frames += 1
+    return frames
+
+
+FALL_FRAMES = fall_frame_count()
+
+
+# Shared caches used by every Pipe
+sprite_cache = SpriteCache()
+mask_cache = MaskCache(sprite_cache)
+
+
+class FontRegistry:
+    """Loads each (name, size) font once and hands out the shared object"""
+    def __init__(self):
+        self.fonts = {}
+        self.specs = {}  # font -> (name, size) it was loaded with
+        self.scaled_fonts = {}  # (font, scale) -> the face at the scaled point size
+        
+    def get(self, name=None, size=32):
+        font = self.fonts.get((name, size))
+        if font is None:
+            font = pygame.font.Font(name, size)
+            self.fonts[(name, size)] = font
+            self.specs[font] = (name, size)
+        return font
+        
+    def scaled(self, font, scale):
+        """The same face at scale times the point size, for drawing at an output scale"""
+        if scale == 1:
+            return font
+        scaled = self.scaled_fonts.get((font, scale))
+        if scaled is None:
+            name, size = self.specs[font]
+            scaled = pygame.font.Font(name, max(1, round(size * scale)))
+            self.scaled_fonts[(font, scale)] = scaled
+        return scaled
+        
+    def keep_scale(self, scale):
+        """Drop the faces loaded for other output scales"""
+        self.scaled_fonts = {key: font for key, font in self.scaled_fonts.items() if key[1] == scale}
+
+
+class TextCache:
+    """LRU cache of rendered text surfaces.
+    
+    Fonts come from the FontRegistry, so a font object stands for its
+    (name, size) pair in the cache key.
+    """
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        
+    def render(self, font, text, color, antialias=True):
+        key = (font, text, color, antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+        
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)
+        return surface
+        
+    def clear(self):
+        self.surfaces.clear()
+        
+    def stats(self):
+        return {"size": len(self.surfaces), "hits": self.hits, "misses": self.misses}
+
+
+# Shared font registry and text cache used by widgets and screens
+fonts = FontRegistry()
+text_cache = TextCache()
+
+
+def release_other_scales(scale):
+    """Free the fonts, text and sprites rendered for output scales other than scale"""
+    fonts.keep_scale(scale)
+    text_cache.clear()
+    sprite_cache.keep_scale(scale)
+
+
+def rle_accelerate(surface):
+    """RLE-encode a finished widget surface on its first blit.
+    
+    Widget surfaces are mostly transparent and never drawn on again, and
+    RLE blits skip the empty pixels (about 20x faster than a plain
+    per-pixel alpha blit). Set it only after drawing: text blitted onto
+    a surface that already has the flag comes out too faint.
+    """
+    surface.set_alpha(255, pygame.RLEACCEL)
+    return surface
+
+
+class Canvas:
+    """A surface addressed in layout units.
+    
+    Screens are laid out for SCREEN_WIDTH x SCREEN_HEIGHT; a canvas maps
+    those units onto a surface scale times as large, so shapes, text and
+    sprites are rasterized at the output resolution instead of stretched
+    afterwards. Text and sprites come from the shared caches at the
+    canvas scale. At scale 1 every call is the plain pygame one.
+    """
+    def __init__(self, surface, scale=1):
+        self.surface = surface
+        self.scale = scale
+        
+    def pixel_size(self, size):
+        return (max(1, round(size[0] * self.scale)), max(1, round(size[1] * self.scale)))
+        
+    def rect(self, rect):
+        """Pixel rect drawn for a layout rect (edges truncated as pygame does)"""
+        x, y, width, height = rect
+        scale = self.scale
+        left, top = int(x * scale), int(y * scale)
+        return pygame.Rect(left, top, int((x + width) * scale) - left, int((y + height) * scale) - top)
+        
+    def bounds(self, rect):
+        """Smallest pixel rect covering a layout rect (for clipping and display updates)"""
+        x, y, width, height = rect
+        scale = self.scale
+        left, top = math.floor(x * scale), math.floor(y * scale)
+        return pygame.Rect(left, top, math.ceil((x + width) * scale) - left, math.ceil((y + height) * scale) - top)
+        
+    def line_width(self, width):
+        return max(1, round(width * self.scale)) if width else 0
+        
+    def layer(self, size, alpha=True):
+        """A blank canvas of size layout units at this scale, for pre-rendered surfaces"""
+        if alpha:
+            surface = pygame.Surface(self.pixel_size(size), pygame.SRCALPHA)
+        else:
+            surface = pygame.Surface(self.pixel_size(size)).convert()
+        return Canvas(surface, self.scale)
+        
+    def text(self, font, text, color):
+        return text_cache.render(fonts.scaled(font, self.scale), text, color)
+        
+    def sprite(self, image, width, height, flipped=False):
+        return sprite_cache.get(image, width, height, flipped, self.scale)
+        
+    def rotated_sprite(self, image, width, height, angle, flipped=False):
+        return sprite_cache.get_rotated(image, width, height, angle, flipped, self.scale)
+        
+    def blit(self, source, dest=(0, 0), **anchor):
+        """Blit a pixel surface at a layout position, or at one rect anchor (e.g. center=(x, y))"""
+        scale = self.scale
+        if anchor:
+            (name, (x, y)), = anchor.items()
+            dest = source.get_rect(**{name: (x * scale, y * scale)})
+        else:
+            dest = (dest[0] * scale, dest[1] * scale)
+        return self.surface.blit(source, dest)
+        
+    def fill(self, color, rect=None):
+        self.surface.fill(color, None if rect is None else self.rect(rect))
+        
+    def set_clip(self, rect):
+        self.surface.set_clip(None if rect is None else self.bounds(rect))
+        
+    def draw_rect(self, color, rect, width=0, border_radius=0):
+        pygame.draw.rect(self.surface, color, self.rect(rect), self.line_width(width),
+                         border_radius=round(border_radius * self.scale))
+        
+    def draw_ellipse(self, color, rect, width=0):
+        pygame.draw.ellipse(self.surface, color, self.rect(rect), self.line_width(width))
+        
+    def draw_circle(self, color, center, radius, width=0):
+        scale = self.scale
+        pygame.draw.circle(self.surface, color, (center[0] * scale, center[1] * scale),
+                           round(radius * scale), self.line_width(width))
+        
+    def draw_polygon(self, color, points, width=0):
+        scale = self.scale
+        pygame.draw.polygon(self.surface, color, [(x * scale, y * scale) for x, y in points],
+                            self.line_width(width))
+        
+    def draw_line(self, color, start, end, width=1):
+        scale = self.scale
+        pygame.draw.line(self.surface, color, (start[0] * scale, start[1] * scale),
+                         (end[0] * scale, end[1] * scale), self.line_width(width))
+
+
+class NightSky:
+    """Pre-rendered stars, moon and night clouds for the day/night cycle.
+    
+    Only the current output scale is kept; the sprites are rebuilt when it
+    changes.
+    """
+    def __init__(self, alpha_buckets=NIGHT_ALPHA_BUCKETS):
+        self.alpha_buckets = alpha_buckets
+        self.scale = None  # Output scale the sprites below are rendered at
+        self.stars = {}
+        self.moons = {}
+        self.night_cloud = None
+        # Star blits are rebuilt only when the twinkle step, fade or scale changes
+        self.star_blits_key = None
+        self.star_blits = []
+        
+    def quantize_alpha(self, alpha):
+        """Snap an opacity to the nearest pre-rendered bucket"""
+        steps = self.alpha_buckets - 1
+        return round(round(alpha * steps / 255) * 255 / steps)
+        
+    def use_scale(self, scale):
+        """Drop the sprites rendered at another output scale"""
+        if scale != self.scale:
+            self.stars.clear()
+            self.moons.clear()
+            self.night_cloud = None
+            self.scale = scale
+            
+    def star(self, screen, alpha):
+        surface = self.stars.get(alpha)
+        if surface is None:
+            star = screen.layer((6, 6))
+            star_color = (255, 255, 255, alpha)
+            
+            # Draw star shape (cross pattern)
+            star.draw_circle(star_color, (3, 3), 2)
+            star.draw_line(star_color, (3, 0), (3, 6), 1)
+            star.draw_line(star_color, (0, 3), (6, 3), 1)
+            surface = self.stars[alpha] = star.surface
+        return surface
+        
+    def moon(self, screen, alpha):
+        surface = self.moons.get(alpha)
+        if surface is None:
+            moon = screen.layer((MOON_RADIUS * 2 + 10, MOON_RADIUS * 2 + 10))
+            moon_color = (240, 240, 200, alpha)  # Pale yellow
+            moon.draw_circle(moon_color, (MOON_RADIUS + 5, MOON_RADIUS + 5), MOON_RADIUS)
+            
+            # Draw craters for detail
+            crater_color = (200, 200, 180, alpha // 2)
+            moon.draw_circle(crater_color, (MOON_RADIUS - 5, MOON_RADIUS), 6)
+            moon.draw_circle(crater_color, (MOON_RADIUS + 10, MOON_RADIUS + 8), 4)
+            moon.draw_circle(crater_color, (MOON_RADIUS + 5, MOON_RADIUS - 8), 5)
+            surface = self.moons[alpha] = moon.surface
+        return surface
+        
+    def cloud(self, screen):
+        """Darker, translucent cloud used at night"""
+        self.use_scale(screen.scale)
+        if self.night_cloud is None:
+            cloud = screen.layer((150, 50))
+            cloud_color = (200, 200, 200, 100)
+            cloud.draw_ellipse(cloud_color, (0, 10, 80, 40))
+            cloud.draw_ellipse(cloud_color, (20, 0, 60, 40))
+            cloud.draw_ellipse(cloud_color, (40, 10, 70, 35))
+            self.night_cloud = cloud.surface
+        return self.night_cloud
+        
+    def draw(self, screen, alpha, game_time):
+        """Draw stars and moon at the given fade level (0-255)"""
+        twinkle_step = game_time // 300
+        scale = screen.scale
+        self.use_scale(scale)
+        key = (twinkle_step, alpha, scale)
+        if key != self.star_blits_key:
+            self.star_blits = []
+            for star_x, star_y in STAR_POSITIONS:
+                # Twinkling effect
+                twinkle = abs((twinkle_step + star_x) % 100 - 50) / 50
+                star_alpha = self.quantize_alpha(int(alpha * (0.5 + 0.5 * twinkle)))
+                self.star_blits.append((self.star(screen, star_alpha), (star_x * scale, star_y * scale)))
+            self.star_blits_key = key
+        screen.surface.blits(self.star_blits, doreturn=False)
+        
+        screen.blit(self.moon(screen, self.quantize_alpha(alpha)),
+                    (MOON_X - MOON_RADIUS - 5, MOON_Y - MOON_RADIUS - 5))
 
 
 class Particle:
-    def __init__(self, x, y):
+    __slots__ = ("x", "y", "vx", "vy", "life", "size", "color")
+    
+    def __init__(self, x, y, rng=random):
         self.x = x
         self.y = y
-        self.vx = random.uniform(-5, 5)
-        self.vy = random.uniform(-8, -2)
-        self.life = 60  # frames
-        self.size = random.randint(3, 8)
-        self.color = random.choice([RED, ORANGE, YELLOW, DARK_RED])
+        self.vx = rng.uniform(-5, 5)
+        self.vy = rng.uniform(-8, -2)
+        self.life = PARTICLE_LIFE
+        self.size = rng.randint(3, 8)
+        self.color = rng.choice(PARTICLE_COLORS)
         
     def update(self):
         self.x += self.vx
@@ -68,198 +701,333 @@ class Particle:
         
     def draw(self, screen):
         if self.life > 0:
-            alpha = int(255 * (self.life / 60))
-            color = tuple(min(255, c + (255 - c) * (1 - self.life / 60)) for c in self.color[:3])
-            pygame.draw.circle(screen, color, (int(self.x), int(self.y)), int(self.size))
+            color = tuple(min(255, c + (255 - c) * (1 - self.life / PARTICLE_LIFE)) for c in self.color[:3])
+            screen.draw_circle(color, (int(self.x), int(self.y)), int(self.size))
             
     def is_alive(self):
         return self.life > 0
 
 
-class Airplane:
-    def __init__(self, image=None):
-        self.x = 100
-        self.y = SCREEN_HEIGHT // 2
-        self.velocity = 0
-        self.width = 40  # Reduced for better collision
-        self.height = 24  # Reduced for better collision
-        self.angle = 0
-        self.image = image
-        self.use_image = image is not None
+class ParticleList:
+    """Particle container built on pooled Particle objects, used when NumPy is missing"""
+    def __init__(self):
+        self.particles = []
+        self.pool = ObjectPool(Particle)
+        self.rng = random.Random()
+        
+    def __len__(self):
+        return len(self.particles)
         
-    def flap(self):
-        self.velocity = FLAP_STRENGTH
+    def seed(self, seed):
+        self.rng = random.Random(seed)
         
+    def clear(self):
+        for particle in self.particles:
+            self.pool.release(particle)
+        self.particles.clear()
+        
+    def emit(self, x, y, count):
+        for _ in range(count):
+            self.particles.append(self.pool.acquire(x, y, self.rng))
+            
     def update(self):
-        self.velocity += GRAVITY
-        self.y += self.velocity
+        # Compact the survivors in place and recycle the dead
+        particles = self.particles
+        live = 0
+        for particle in particles:
+            particle.update()
+            if particle.is_alive():
+                particles[live] = particle
+                live += 1
+            else:
+                self.pool.release(particle)
+        del particles[live:]
         
-        # Update angle based on velocity
-        if self.velocity < 0:
-            self.angle = min(25, -self.velocity * 3)
-        else:
-            self.angle = max(-90, -self.velocity * 2)
+    def stats(self):
+        return self.pool.stats()
+        
+    def draw(self, screen):
+        for particle in self.particles:
+            particle.draw(screen)
+
+
+class ParticleSystem:
+    """Particles stored in preallocated NumPy arrays with a fixed capacity.
+    
+    Live particles occupy the first `count` slots and the remaining slots
+    form the free list, so emitting just fills the next free slots. Dead
+    particles are removed by compacting the survivors to the front.
+    """
+    def __init__(self, capacity=PARTICLE_CAPACITY):
+        self.capacity = capacity
+        self.count = 0
+        self.pos = np.zeros((capacity, 2))
+        self.vel = np.zeros((capacity, 2))
+        self.life = np.zeros(capacity)
+        self.size = np.zeros(capacity)
+        self.color = np.zeros((capacity, 3))
+        self.palette = np.array(PARTICLE_COLORS, dtype=float)
+        self.rng = np.random.default_rng()
+        
+    def __len__(self):
+        return self.count
+        
+    def seed(self, seed):
+        self.rng = np.random.default_rng(seed)
+        
+    def clear(self):
+        self.count = 0
+        
+    def emit(self, x, y, count):
+        """Spawn up to count particles at (x, y); extra ones are dropped when full"""
+        count = min(count, self.capacity - self.count)
+        if count <= 0:
+            return
+        new = slice(self.count, self.count + count)
+        self.pos[new] = (x, y)
+        self.vel[new, 0] = self.rng.uniform(-5, 5, count)
+        self.vel[new, 1] = self.rng.uniform(-8, -2, count)
+        self.life[new] = PARTICLE_LIFE
+        self.size[new] = self.rng.integers(3, 9, count)
+        self.color[new] = self.palette[self.rng.integers(0, len(self.palette), count)]
+        self.count += count
+        
+    def update(self):
+        n = self.count
+        if n == 0:
+            return
+        pos = self.pos[:n]
+        vel = self.vel[:n]
+        life = self.life[:n]
+        size = self.size[:n]
+        pos += vel
+        vel[:, 1] += 0.3  # gravity
+        life -= 1
+        size -= 0.1
+        np.maximum(size, 1, out=size)
+        
+        alive = life > 0
+        live_count = int(np.count_nonzero(alive))
+        if live_count < n:
+            # Compact survivors to the front; freed slots rejoin the tail
+            for array in (self.pos, self.vel, self.life, self.size, self.color):
+                array[:live_count] = array[:n][alive]
+            self.count = live_count
             
+    def stats(self):
+        # Every slot is allocated up front; free slots act as the pool
+        return {"live": self.count, "pooled": self.capacity - self.count, "allocated": self.capacity}
+        
     def draw(self, screen):
+        n = self.count
+        if n == 0:
+            return
+        fade = 1 - self.life[:n] / PARTICLE_LIFE
+        base = self.color[:n]
+        colors = (base + (255 - base) * fade[:, None]).astype(int).tolist()
+        # Scaled to output pixels here so the loop stays plain pygame calls
+        centers = (self.pos[:n] * screen.scale).astype(int).tolist()
+        sizes = (self.size[:n] * screen.scale).astype(int).tolist()
+        surface = screen.surface
+        draw_circle = pygame.draw.circle
+        for color, center, size in zip(colors, centers, sizes):
+            draw_circle(surface, color, center, size)
+
+
+def create_particle_system():
+    """Vectorized particles when NumPy is available, plain objects otherwise"""
+    if np is not None:
+        return ParticleSystem()
+    return ParticleList()
+
+
+def draw_fallback_airplane(canvas, x, y):
+    """Draw the built-in airplane (used when no image is found) centered at (x, y)"""
+    # Draw airplane body (fallback)
+    points = [
+        (x - 20, y),
+        (x + 20, y - 5),
+        (x + 25, y),
+        (x + 20, y + 5)
+    ]
+    canvas.draw_polygon(GRAY, points)
+    
+    # Draw wings
+    canvas.draw_polygon(RED, [
+        (x - 10, y - 2),
+        (x - 10, y - 15),
+        (x + 5, y - 2)
+    ])
+    canvas.draw_polygon(RED, [
+        (x - 10, y + 2),
+        (x - 10, y + 15),
+        (x + 5, y + 2)
+    ])
+    
+    # Draw tail
+    canvas.draw_polygon(YELLOW, [
+        (x - 20, y - 8),
+        (x - 25, y),
+        (x - 20, y + 8)
+    ])
+    
+    # Draw cockpit window
+    canvas.draw_circle(BLACK, (x + 15, y), 4)
+
+
+_fallback_airplane = None
+
+
+def fallback_airplane_image():
+    """The built-in airplane drawn once onto a transparent AIRPLANE_IMAGE_SIZE surface"""
+    global _fallback_airplane
+    if _fallback_airplane is None:
+        width, height = AIRPLANE_IMAGE_SIZE
+        _fallback_airplane = pygame.Surface((width, height), pygame.SRCALPHA)
+        draw_fallback_airplane(Canvas(_fallback_airplane), width // 2, height // 2)
+    return _fallback_airplane
+
+
+class Airplane(AirplaneBody):
+    __slots__ = ("image", "use_image", "prev_y")
+    
+    def __init__(self, image=None):
+        super().__init__()
+        self.image = image
+        self.use_image = image is not None
+        self.prev_y = self.y
+        
+    def save_previous(self):
+        """Remember the current position for render interpolation"""
+        self.prev_y = self.y
+        
+    def draw(self, screen, alpha=1.0):
+        """Draw between the previous and current tick (alpha 0..1)"""
+        x = self.x
+        y = self.prev_y + (self.y - self.prev_y) * alpha
         if self.use_image:
             # Draw image centered at airplane position
-            img_rect = self.image.get_rect(center=(int(self.x), int(self.y)))
-            screen.blit(self.image, img_rect)
+            image = screen.sprite(self.image, *self.image.get_size())
+            screen.blit(image, center=(int(x), int(y)))
         else:
-            # Draw airplane body (fallback)
-            points = [
-                (self.x - 20, self.y),
-                (self.x + 20, self.y - 5),
-                (self.x + 25, self.y),
-                (self.x + 20, self.y + 5)
-            ]
-            pygame.draw.polygon(screen, GRAY, points)
-            
-            # Draw wings
-            pygame.draw.polygon(screen, RED, [
-                (self.x - 10, self.y - 2),
-                (self.x - 10, self.y - 15),
-                (self.x + 5, self.y - 2)
-            ])
-            pygame.draw.polygon(screen, RED, [
-                (self.x - 10, self.y + 2),
-                (self.x - 10, self.y + 15),
-                (self.x + 5, self.y + 2)
-            ])
-            
-            # Draw tail
-            pygame.draw.polygon(screen, YELLOW, [
-                (self.x - 20, self.y - 8),
-                (self.x - 25, self.y),
-                (self.x - 20, self.y + 8)
-            ])
-            
-            # Draw cockpit window
-            pygame.draw.circle(screen, BLACK, (self.x + 15, self.y), 4)
+            draw_fallback_airplane(screen, x, y)
         
     def get_rect(self):
         # More accurate collision box - centered on airplane
         return pygame.Rect(self.x - self.width // 2, self.y - self.height // 2, self.width, self.height)
         
-    def is_off_screen(self):
-        return self.y < 0 or self.y > SCREEN_HEIGHT
+    def get_mask(self):
+        """Collision mask and its top-left screen position, matching draw()"""
+        image = self.image if self.use_image else fallback_airplane_image()
+        width, height = image.get_size()
+        mask = mask_cache.get(image, width, height)
+        return mask, (int(self.x) - width // 2, int(self.y) - height // 2)
 
 
-class Pipe:
-    def __init__(self, x, velocity=INITIAL_PIPE_VELOCITY, gap_size=INITIAL_PIPE_GAP, pipe_image=None):
-        self.x = x
-        self.velocity = velocity
-        self.gap_size = gap_size
-        # Ensure pipe gap is always in a playable position
-        # Minimum 100px from top, maximum leaves 100px at bottom
-        min_height = 100
-        max_height = SCREEN_HEIGHT - gap_size - 100
-        # Ensure max_height is always greater than min_height
-        if max_height <= min_height:
-            max_height = min_height + 50
-        self.height = random.randint(min_height, max_height)
-        self.passed = False
+class Pipe(PipeBody):
+    __slots__ = ("pipe_image", "use_image", "warmed_frames", "prev_x", "prev_fall_y_offset")
+    
+    def __init__(self, x, velocity=INITIAL_PIPE_VELOCITY, gap_size=INITIAL_PIPE_GAP, pipe_image=None,
+                 width=None, rng=random):
+        super().__init__(x, velocity, gap_size, PIPE_WIDTH if width is None else width, rng)
         self.pipe_image = pipe_image
         self.use_image = pipe_image is not None
-        
-        # Falling animation properties
-        self.falling = False
-        self.fall_rotation = 0
-        self.fall_direction = random.choice([-1, 1])  # -1 for left, 1 for right
-        self.fall_speed = 0
-        self.fall_y_offset = 0
-        
-    def update(self):
-        if not self.falling:
-            self.x -= self.velocity
-        else:
-            # Falling animation
-            self.fall_rotation += 3 * self.fall_direction  # Rotate
-            self.fall_speed += 0.5  # Gravity
-            self.fall_y_offset += self.fall_speed  # Fall down
-            self.x += self.fall_direction * 2  # Move sideways
-        
-    def draw(self, screen):
+        self.warmed_frames = 0  # Falling frames already pre-rendered
+        self.prev_x = self.x
+        self.prev_fall_y_offset = 0
+        
+    def save_previous(self):
+        """Remember the current position for render interpolation"""
+        self.prev_x = self.x
+        self.prev_fall_y_offset = self.fall_y_offset
+        
+    def draw(self, screen, alpha=1.0):
+        """Draw between the previous and current tick (alpha 0..1)"""
+        x = self.prev_x + (self.x - self.prev_x) * alpha
+        fall_y_offset = self.prev_fall_y_offset + (self.fall_y_offset - self.prev_fall_y_offset) * alpha
         if self.falling:
-            # Draw falling pipes with rotation
-            if self.use_image:
-                # Top pipe falling
-                top_pipe_img = pygame.transform.flip(self.pipe_image, False, True)
-                top_pipe_scaled = pygame.transform.scale(top_pipe_img, (PIPE_WIDTH, self.height))
-                rotated_top = pygame.transform.rotate(top_pipe_scaled, self.fall_rotation)
-                top_rect = rotated_top.get_rect(center=(self.x + PIPE_WIDTH // 2, self.height // 2 + self.fall_y_offset))
-                screen.blit(rotated_top, top_rect)
-                
-                # Bottom pipe falling
-                bottom_y = self.height + self.gap_size
-                bottom_height = SCREEN_HEIGHT - bottom_y
-                bottom_pipe_scaled = pygame.transform.scale(self.pipe_image, (PIPE_WIDTH, bottom_height))
-                rotated_bottom = pygame.transform.rotate(bottom_pipe_scaled, self.fall_rotation)
-                bottom_rect = rotated_bottom.get_rect(center=(self.x + PIPE_WIDTH // 2, bottom_y + bottom_height // 2 + self.fall_y_offset))
-                screen.blit(rotated_bottom, bottom_rect)
-            else:
-                # Fallback: draw rotated rectangles
-                # Create surfaces for pipes
-                top_surface = pygame.Surface((PIPE_WIDTH, self.height), pygame.SRCALPHA)
-                pygame.draw.rect(top_surface, GREEN, (0, 0, PIPE_WIDTH, self.height))
-                pygame.draw.rect(top_surface, DARK_GREEN, (0, 0, PIPE_WIDTH, self.height), 3)
-                rotated_top = pygame.transform.rotate(top_surface, self.fall_rotation)
-                top_rect = rotated_top.get_rect(center=(self.x + PIPE_WIDTH // 2, self.height // 2 + self.fall_y_offset))
-                screen.blit(rotated_top, top_rect)
-                
-                bottom_y = self.height + self.gap_size
-                bottom_height = SCREEN_HEIGHT - bottom_y
-                bottom_surface = pygame.Surface((PIPE_WIDTH, bottom_height), pygame.SRCALPHA)
-                pygame.draw.rect(bottom_surface, GREEN, (0, 0, PIPE_WIDTH, bottom_height))
-                pygame.draw.rect(bottom_surface, DARK_GREEN, (0, 0, PIPE_WIDTH, bottom_height), 3)
-                rotated_bottom = pygame.transform.rotate(bottom_surface, self.fall_rotation)
-                bottom_rect = rotated_bottom.get_rect(center=(self.x + PIPE_WIDTH // 2, bottom_y + bottom_height // 2 + self.fall_y_offset))
-                screen.blit(rotated_bottom, bottom_rect)
+            if fall_y_offset > FALL_OFFSCREEN_OFFSET:
+                return
+            # Draw falling pipes from the pre-rendered rotation frames
+            rotated_top = screen.rotated_sprite(self.pipe_image, self.width, self.height,
+                                                self.fall_rotation, flipped=self.use_image)
+            screen.blit(rotated_top, center=(x + self.width // 2, self.height // 2 + fall_y_offset))
+            
+            bottom_y = self.height + self.gap_size
+            bottom_height = SCREEN_HEIGHT - bottom_y
+            rotated_bottom = screen.rotated_sprite(self.pipe_image, self.width, bottom_height, self.fall_rotation)
+            screen.blit(rotated_bottom, center=(x + self.width // 2, bottom_y + bottom_height // 2 + fall_y_offset))
         else:
             # Normal drawing
             if self.use_image:
                 # Draw top pipe (flipped and stretched to fill height)
-                top_pipe_img = pygame.transform.flip(self.pipe_image, False, True)
-                top_pipe_scaled = pygame.transform.scale(top_pipe_img, (PIPE_WIDTH, self.height))
-                screen.blit(top_pipe_scaled, (self.x, 0))
+                top_pipe_scaled = screen.sprite(self.pipe_image, self.width, self.height, flipped=True)
+                screen.blit(top_pipe_scaled, (x, 0))
                 
                 # Draw bottom pipe (stretched to fill height)
                 bottom_y = self.height + self.gap_size
                 bottom_height = SCREEN_HEIGHT - bottom_y
-                bottom_pipe_scaled = pygame.transform.scale(self.pipe_image, (PIPE_WIDTH, bottom_height))
-                screen.blit(bottom_pipe_scaled, (self.x, bottom_y))
+                bottom_pipe_scaled = screen.sprite(self.pipe_image, self.width, bottom_height)
+                screen.blit(bottom_pipe_scaled, (x, bottom_y))
             else:
                 # Draw top pipe (fallback)
-                pygame.draw.rect(screen, GREEN, (self.x, 0, PIPE_WIDTH, self.height))
-                pygame.draw.rect(screen, DARK_GREEN, (self.x, 0, PIPE_WIDTH, self.height), 3)
-                pygame.draw.rect(screen, DARK_GREEN, (self.x - 5, self.height - 20, PIPE_WIDTH + 10, 20))
+                screen.draw_rect(GREEN, (x, 0, self.width, self.height))
+                screen.draw_rect(DARK_GREEN, (x, 0, self.width, self.height), 3)
+                screen.draw_rect(DARK_GREEN, (x - 5, self.height - 20, self.width + 10, 20))
                 
                 # Draw bottom pipe (fallback)
                 bottom_y = self.height + self.gap_size
                 bottom_height = SCREEN_HEIGHT - bottom_y
-                pygame.draw.rect(screen, GREEN, (self.x, bottom_y, PIPE_WIDTH, bottom_height))
-                pygame.draw.rect(screen, DARK_GREEN, (self.x, bottom_y, PIPE_WIDTH, bottom_height), 3)
-                pygame.draw.rect(screen, DARK_GREEN, (self.x - 5, bottom_y, PIPE_WIDTH + 10, 20))
-        
-    def is_off_screen(self):
-        return self.x < -PIPE_WIDTH
-        
-    def start_falling(self):
-        """Start the falling animation"""
-        self.falling = True
-    
-    def collides_with(self, airplane):
-        if self.falling:  # Don't check collision if already falling
+                screen.draw_rect(GREEN, (x, bottom_y, self.width, bottom_height))
+                screen.draw_rect(DARK_GREEN, (x, bottom_y, self.width, bottom_height), 3)
+                screen.draw_rect(DARK_GREEN, (x - 5, bottom_y, self.width + 10, 20))
+        
+    def overlaps_pixels(self, airplane):
+        """Narrow phase for precise collision: do opaque pixels of the drawn sprites touch?
+        
+        Only called once the collision boxes overlap (see Simulation).
+        """
+        airplane_mask, (left, top) = airplane.get_mask()
+        x = int(self.x)
+        top_mask = mask_cache.get(self.pipe_image, self.width, self.height, flipped=self.use_image)
+        if airplane_mask.overlap(top_mask, (x - left, -top)):
+            return True
+        bottom_y = self.height + self.gap_size
+        bottom_height = SCREEN_HEIGHT - bottom_y
+        if bottom_height <= 0:
             return False
-        airplane_rect = airplane.get_rect()
-        top_pipe = pygame.Rect(self.x, 0, PIPE_WIDTH, self.height)
-        bottom_pipe = pygame.Rect(self.x, self.height + self.gap_size, PIPE_WIDTH, 
-                                  SCREEN_HEIGHT - self.height - self.gap_size)
-        return airplane_rect.colliderect(top_pipe) or airplane_rect.colliderect(bottom_pipe)
+        bottom_mask = mask_cache.get(self.pipe_image, self.width, bottom_height)
+        return airplane_mask.overlap(bottom_mask, (x - left, bottom_y - top)) is not None
+        
+    def warm_fall_frames(self, budget=FALL_FRAME_WARM_BUDGET, scale=1):
+        """Pre-render up to budget rotation frames of the falling animation at an output scale.
+        
+        Called while the pipe approaches the airplane so a crash only blits.
+        Returns the number of frames rendered.
+        """
+        bottom_height = SCREEN_HEIGHT - self.height - self.gap_size
+        # Larger frames take longer to rotate, so fewer are rendered per frame
+        budget = max(1, round(budget / max(1, scale) ** 2))
+        rendered = 0
+        while self.warmed_frames < FALL_FRAMES and rendered < budget:
+            self.warmed_frames += 1
+            angle = 3 * self.fall_direction * self.warmed_frames
+            if not sprite_cache.has_rotated(self.pipe_image, self.width, self.height, angle, self.use_image, scale):
+                sprite_cache.get_rotated(self.pipe_image, self.width, self.height, angle, self.use_image, scale)
+                rendered += 1
+            if not sprite_cache.has_rotated(self.pipe_image, self.width, bottom_height, angle, scale=scale):
+                sprite_cache.get_rotated(self.pipe_image, self.width, bottom_height, angle, scale=scale)
+                rendered += 1
+        return rendered
 
 
 class Button:
-    """Simple button class for UI"""
+    """Simple button class for UI.
+    
+    Each visual state (normal, hovered) is rendered once into its own
+    surface; the surfaces are dropped when the text, font or output scale
+    changes.
+    """
     def __init__(self, x, y, width, height, text, color, hover_color, text_color=WHITE):
         self.rect = pygame.Rect(x, y, width, height)
         self.text = text
@@ -267,15 +1035,30 @@ class Button:
         self.hover_color = hover_color
         self.text_color = text_color
         self.is_hovered = False
+        self.surfaces = {}  # is_hovered -> pre-rendered button
+        self.surfaces_key = None  # (text, font, scale) the surfaces were rendered with
         
     def draw(self, screen, font):
+        key = (self.text, font, screen.scale)
+        if self.surfaces_key != key:
+            self.surfaces.clear()
+            self.surfaces_key = key
+        surface = self.surfaces.get(self.is_hovered)
+        if surface is None:
+            surface = self.render(screen, font)
+            self.surfaces[self.is_hovered] = surface
+        screen.blit(surface, self.rect)
+        
+    def render(self, screen, font):
+        button = screen.layer(self.rect.size)
+        rect = pygame.Rect((0, 0), self.rect.size)
         color = self.hover_color if self.is_hovered else self.color
-        pygame.draw.rect(screen, color, self.rect, border_radius=10)
-        pygame.draw.rect(screen, WHITE, self.rect, 3, border_radius=10)
+        button.draw_rect(color, rect, border_radius=10)
+        button.draw_rect(WHITE, rect, 3, border_radius=10)
         
-        text_surface = font.render(self.text, True, self.text_color)
-        text_rect = text_surface.get_rect(center=self.rect.center)
-        screen.blit(text_surface, text_rect)
+        text_surface = button.text(font, self.text, self.text_color)
+        button.blit(text_surface, center=rect.center)
+        return rle_accelerate(button.surface)
         
     def is_clicked(self, pos):
         return self.rect.collidepoint(pos)
@@ -300,6 +1083,8 @@ class Slider:
         self.track_rect = pygame.Rect(x, y + height // 2 - 2, width, 4)
         self.handle_radius = 10
         self.update_handle_pos()
+        self.surface = None
+        self.surface_key = None  # (fill, handle x, label, font, scale) the surface shows
         
     def update_handle_pos(self):
         """Update handle position based on value"""
@@ -308,20 +1093,38 @@ class Slider:
         self.handle_y = self.y + self.height // 2
         
     def draw(self, screen, font):
+        # Re-rendered only when the handle moves or the label changes
+        filled_width = int((self.value - self.min_val) / (self.max_val - self.min_val) * self.width)
+        key = (filled_width, self.handle_x, int(self.value), font, screen.scale)
+        if key != self.surface_key:
+            self.surface = self.render(screen, font, filled_width)
+            self.surface_key = key
+        screen.blit(self.surface, self.get_rect())
+        
+    def render(self, screen, font, filled_width):
+        rect = self.get_rect()
+        slider = screen.layer(rect.size)
+        dx, dy = -rect.x, -rect.y
         # Draw track
-        pygame.draw.rect(screen, GRAY, self.track_rect, border_radius=2)
+        slider.draw_rect(GRAY, self.track_rect.move(dx, dy), border_radius=2)
         # Draw filled portion
-        filled_width = int((self.value - self.min_val) / (self.max_val - self.min_val) * self.width)
-        filled_rect = pygame.Rect(self.x, self.y + self.height // 2 - 2, filled_width, 4)
-        pygame.draw.rect(screen, (46, 204, 113), filled_rect, border_radius=2)
+        filled_rect = pygame.Rect(self.x + dx, self.y + self.height // 2 - 2 + dy, filled_width, 4)
+        slider.draw_rect((46, 204, 113), filled_rect, border_radius=2)
         
         # Draw handle
-        pygame.draw.circle(screen, WHITE, (self.handle_x, self.handle_y), self.handle_radius)
-        pygame.draw.circle(screen, (46, 204, 113), (self.handle_x, self.handle_y), self.handle_radius - 2)
+        handle = (self.handle_x + dx, self.handle_y + dy)
+        slider.draw_circle(WHITE, handle, self.handle_radius)
+        slider.draw_circle((46, 204, 113), handle, self.handle_radius - 2)
         
         # Draw value text
-        value_text = font.render(f"{int(self.value)}%", True, WHITE)
-        screen.blit(value_text, (self.x + self.width + 15, self.y))
+        value_text = slider.text(font, f"{int(self.value)}%", WHITE)
+        slider.blit(value_text, (self.x + self.width + 15 + dx, self.y + dy))
+        return rle_accelerate(slider.surface)
+        
+    def get_rect(self):
+        """Area covered by the track, handle and value label"""
+        return pygame.Rect(self.x - self.handle_radius, self.y,
+                           self.width + self.handle_radius + 85, self.height)
         
     def handle_event(self, event, mouse_pos):
         """Handle mouse events for slider"""
@@ -343,7 +1146,12 @@ class Slider:
 
 
 class Dropdown:
-    """Dropdown menu for music selection"""
+    """Dropdown menu for music selection.
+    
+    The box and, while open, its option rows are rendered into one surface
+    per (open, selected) state; the surfaces are dropped when the options,
+    font or output scale change.
+    """
     def __init__(self, x, y, width, height, options, font):
         self.x = x
         self.y = y
@@ -356,25 +1164,44 @@ class Dropdown:
         
         self.main_rect = pygame.Rect(x, y, width, height)
         self.arrow_size = 8
+        self.surfaces = {}  # (is_open, selected_index) -> pre-rendered dropdown
+        self.surfaces_key = None  # (options, font, scale) the surfaces were rendered with
         
     def draw(self, screen):
+        key = (tuple(self.options), self.font, screen.scale)
+        if key != self.surfaces_key:
+            self.surfaces.clear()
+            self.surfaces_key = key
+        state = (self.is_open, self.selected_index)
+        surface = self.surfaces.get(state)
+        if surface is None:
+            surface = self.render(screen)
+            self.surfaces[state] = surface
+        screen.blit(surface, self.main_rect)
+        
+    def label(self, canvas, text):
+        # Truncate if too long
+        if len(text) > 20:
+            text = text[:17] + "..."
+        return canvas.text(self.font, text, WHITE)
+        
+    def render(self, screen):
+        rows = 1 + (len(self.options) if self.is_open else 0)
+        dropdown = screen.layer((self.width, self.height * rows))
+        main_rect = pygame.Rect(0, 0, self.width, self.height)
+        
         # Draw main box
         color = (52, 152, 219) if not self.is_open else (41, 128, 185)
-        pygame.draw.rect(screen, color, self.main_rect, border_radius=5)
-        pygame.draw.rect(screen, WHITE, self.main_rect, 2, border_radius=5)
+        dropdown.draw_rect(color, main_rect, border_radius=5)
+        dropdown.draw_rect(WHITE, main_rect, 2, border_radius=5)
         
         # Draw selected option
         if self.options:
-            text = self.options[self.selected_index]
-            # Truncate if too long
-            if len(text) > 20:
-                text = text[:17] + "..."
-            text_surface = self.font.render(text, True, WHITE)
-            screen.blit(text_surface, (self.x + 10, self.y + 10))
+            dropdown.blit(self.label(dropdown, self.options[self.selected_index]), (10, 10))
         
         # Draw arrow
-        arrow_x = self.x + self.width - 20
-        arrow_y = self.y + self.height // 2
+        arrow_x = self.width - 20
+        arrow_y = self.height // 2
         if self.is_open:
             # Up arrow
             points = [(arrow_x, arrow_y + 3), (arrow_x - self.arrow_size, arrow_y - 3), 
@@ -383,27 +1210,24 @@ class Dropdown:
             # Down arrow
             points = [(arrow_x, arrow_y + 3), (arrow_x - self.arrow_size, arrow_y - 3), 
                      (arrow_x + self.arrow_size, arrow_y - 3)]
-        pygame.draw.polygon(screen, WHITE, points)
+        dropdown.draw_polygon(WHITE, points)
         
         # Draw dropdown options if open
         if self.is_open and self.options:
             for i, option in enumerate(self.options):
-                option_y = self.y + self.height + i * self.height
-                option_rect = pygame.Rect(self.x, option_y, self.width, self.height)
+                option_y = self.height + i * self.height
+                option_rect = pygame.Rect(0, option_y, self.width, self.height)
                 
                 # Highlight selected
                 if i == self.selected_index:
-                    pygame.draw.rect(screen, (41, 128, 185), option_rect)
+                    dropdown.draw_rect((41, 128, 185), option_rect)
                 else:
-                    pygame.draw.rect(screen, (52, 152, 219), option_rect)
-                pygame.draw.rect(screen, WHITE, option_rect, 2)
+                    dropdown.draw_rect((52, 152, 219), option_rect)
+                dropdown.draw_rect(WHITE, option_rect, 2)
                 
                 # Draw option text
-                text = option
-                if len(text) > 20:
-                    text = text[:17] + "..."
-                text_surface = self.font.render(text, True, WHITE)
-                screen.blit(text_surface, (self.x + 10, option_y + 10))
+                dropdown.blit(self.label(dropdown, option), (10, option_y + 10))
+        return rle_accelerate(dropdown.surface)
     
     def handle_click(self, pos):
         """Handle click events"""
@@ -428,20 +1252,298 @@ class Dropdown:
         return None
 
 
+def load_difficulty_config(path=DIFFICULTY_FILE):
+    """Tuned difficulty curves from path, or None for the built-in ones"""
+    try:
+        config = flappy_core.load_difficulty(path)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f"[ERROR] Invalid {path}: {e}")
+        print("  Using the default difficulty curves")
+        return None
+    print(f"[OK] Difficulty curves loaded from {path}")
+    return config
+
+
+class FrameProfiler:
+    """Per-phase frame timings for the profiler overlay.
+
+    The main loop calls begin_frame(), mark(phase) after each phase and
+    end_frame(); mark() records the time since the previous mark. While
+    disabled every call returns straight away.
+    """
+    def __init__(self, window=PROFILER_WINDOW, history=PROFILER_HISTORY):
+        self.enabled = False
+        self.active = False  # Inside a profiled frame
+        self.window = window
+        self.history = deque(maxlen=history)  # One row of phase ms per frame
+        self.current = {}
+        self.last_mark = 0
+        self.frames = 0
+        
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.history.clear()
+        self.active = False
+        
+    def begin_frame(self):
+        if self.enabled:
+            self.active = True
+            self.current = dict.fromkeys(PROFILER_PHASES, 0.0)
+            self.last_mark = time.perf_counter()
+        
+    def mark(self, phase):
+        if self.active:
+            now = time.perf_counter()
+            self.current[phase] += (now - self.last_mark) * 1000
+            self.last_mark = now
+        
+    def end_frame(self):
+        if self.active:
+            self.active = False
+            self.history.append([self.current[phase] for phase in PROFILER_PHASES])
+            self.frames += 1
+        
+    def stats(self):
+        """Rolling (name, p50, p95, max) in ms, with derived draw and frame totals"""
+        rows = list(self.history)[-self.window:]
+        if not rows:
+            return []
+        draw_columns = [PROFILER_PHASES.index(phase) for phase in PROFILER_DRAW_PHASES]
+        columns = [(phase, [row[i] for row in rows]) for i, phase in enumerate(PROFILER_PHASES)]
+        columns.insert(2, ("draw", [sum(row[i] for i in draw_columns) for row in rows]))
+        columns.append(("frame", [sum(row) for row in rows]))
+        result = []
+        for name, values in columns:
+            values.sort()
+            result.append((name, values[len(values) // 2], values[int(len(values) * 0.95)], values[-1]))
+        return result
+        
+    def dump_csv(self, path):
+        import csv
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame"] + PROFILER_PHASES + ["total"])
+            first = self.frames - len(self.history)
+            for i, row in enumerate(self.history):
+                writer.writerow([first + i] + [f"{value:.4f}" for value in row] + [f"{sum(row):.4f}"])
+
+
 class DummySound:
     """Dummy sound class for when numpy is not available"""
     def play(self):
         pass
 
 
+class SfxBank:
+    """Sound effects as raw PCM in the mixer's format, cached in the asset cache.
+
+    Synthesized beeps and decoded sound files are stored the first time
+    and later loaded with one read into pygame.mixer.Sound(buffer=...),
+    skipping NumPy synthesis and MP3 decoding. Entries are keyed by the
+    sound's parameters (or file size and mtime) and the mixer format.
+    """
+    def __init__(self, directory=ASSET_CACHE_DIR):
+        self.directory = directory
+        self.mixer_format = pygame.mixer.get_init()
+        self.hits = 0
+        self.misses = 0
+        
+    def entry_path(self, name, key):
+        digest = hashlib.sha1(repr((key, self.mixer_format)).encode()).hexdigest()[:16]
+        return os.path.join(self.directory, f"sfx-{name}-{digest}.pcm")
+        
+    def load(self, name, key, build):
+        """Cached sound for key, or build() it (None if it can't be built) and cache it"""
+        entry = self.entry_path(name, key)
+        try:
+            with open(entry, 'rb') as f:
+                data = f.read()
+            if data:
+                self.hits += 1
+                return pygame.mixer.Sound(buffer=data)
+        except OSError:
+            pass
+        
+        self.misses += 1
+        sound = build()
+        if sound is not None:
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                prefix = f"sfx-{name}-"
+                for old in os.listdir(self.directory):
+                    if old.startswith(prefix) and old != os.path.basename(entry):
+                        os.remove(os.path.join(self.directory, old))
+                temp_path = f"{entry}.tmp"
+                with open(temp_path, 'wb') as f:
+                    f.write(sound.get_raw())
+                os.replace(temp_path, entry)
+            except OSError as e:
+                print(f"[WARNING] Could not cache sound {name}: {e}")
+        return sound
+        
+    def load_file(self, name, path):
+        stat = os.stat(path)
+        return self.load(name, (os.path.abspath(path), stat.st_size, stat.st_mtime_ns),
+                         lambda: pygame.mixer.Sound(path))
+        
+    def beep(self, name, frequency, duration, synthesize):
+        return self.load(name, ("beep", frequency, duration), lambda: synthesize(frequency, duration))
+
+
+class ChannelPool:
+    """Reserved mixer channels shared by sound categories.
+
+    Each category has a voice limit and a priority. At its limit a
+    category restarts its own oldest voice; when every channel is busy it
+    steals the oldest voice of a lower-priority category, or is dropped.
+    counts tracks plays, limit restarts, steals and drops per category
+    for sizing the pool.
+    """
+    def __init__(self, size=SFX_CHANNELS, priorities=SFX_PRIORITIES, limits=SFX_VOICE_LIMITS):
+        if pygame.mixer.get_num_channels() < size:
+            pygame.mixer.set_num_channels(size)
+        pygame.mixer.set_reserved(size)  # Sound.play() elsewhere never takes these
+        self.channels = [pygame.mixer.Channel(i) for i in range(size)]
+        self.owners = [None] * size  # Category last played on each channel
+        self.started = [0] * size  # Play order, for finding the oldest voice
+        self.plays = 0
+        self.priorities = priorities
+        self.limits = limits
+        self.counts = {category: {"played": 0, "limited": 0, "stole": 0, "stolen": 0, "dropped": 0}
+                       for category in priorities}
+        
+    def play(self, category, sound):
+        busy = [channel.get_busy() for channel in self.channels]
+        own = [i for i, owner in enumerate(self.owners) if busy[i] and owner == category]
+        counts = self.counts[category]
+        if len(own) >= self.limits[category]:
+            index = min(own, key=self.started.__getitem__)
+            counts["limited"] += 1
+        elif not all(busy):
+            index = busy.index(False)
+        else:
+            priority = self.priorities[category]
+            victims = [i for i, owner in enumerate(self.owners)
+                       if owner is not None and self.priorities[owner] < priority]
+            if not victims:
+                counts["dropped"] += 1
+                return
+            index = min(victims, key=lambda i: (self.priorities[self.owners[i]], self.started[i]))
+            counts["stole"] += 1
+            self.counts[self.owners[index]]["stolen"] += 1
+        self.plays += 1
+        self.owners[index] = category
+        self.started[index] = self.plays
+        self.channels[index].play(sound)
+        counts["played"] += 1
+        
+    def voice(self, category, sound):
+        """Object with play() that routes sound through this pool"""
+        if isinstance(sound, DummySound):
+            return sound
+        return PooledSound(self, category, sound)
+        
+    def report(self):
+        for category, counts in self.counts.items():
+            details = ", ".join(f"{outcome} {count}" for outcome, count in counts.items())
+            print(f"[INFO] SFX {category}: {details}")
+
+
+class PooledSound:
+    """A sound effect played through a ChannelPool category"""
+    def __init__(self, pool, category, sound):
+        self.pool = pool
+        self.category = category
+        self.sound = sound
+        
+    def play(self):
+        self.pool.play(self.category, self.sound)
+
+
+class Viewport:
+    """The window that shows the SCREEN_WIDTH x SCREEN_HEIGHT layout.
+    
+    The layout is fitted into the window, letterboxed to keep its aspect
+    ratio, and drawn straight into that part of the window through a
+    Canvas at the fitted scale: text, shapes and sprites are rasterized at
+    the output resolution and a frame is never stretched afterwards.
+    Mouse positions are mapped back to layout units.
+    """
+    def __init__(self, fullscreen=False, size=None):
+        self.logical_size = (SCREEN_WIDTH, SCREEN_HEIGHT)
+        self.fullscreen = fullscreen
+        self.window = None
+        self.canvas = None  # Frame buffer everything draws on, in layout units
+        self.rect = pygame.Rect((0, 0), self.logical_size)  # Frame position in the window
+        self.open(size)
+        
+    def open(self, size=None):
+        """(Re)create the window at size (default: the layout size, or the desktop when fullscreen)"""
+        if self.fullscreen:
+            self.window = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+        else:
+            self.window = pygame.display.set_mode(size or self.logical_size, pygame.RESIZABLE)
+        self.layout()
+        
+    def layout(self):
+        """Fit the layout into the current window, keeping its aspect ratio"""
+        self.window = pygame.display.get_surface()
+        window_width, window_height = self.window.get_size()
+        logical_width, logical_height = self.logical_size
+        scale = min(window_width / logical_width, window_height / logical_height)
+        size = (max(1, min(window_width, round(logical_width * scale))),
+                max(1, min(window_height, round(logical_height * scale))))
+        self.rect = pygame.Rect((0, 0), size)
+        self.rect.center = (window_width // 2, window_height // 2)
+        self.window.fill(BLACK)
+        if self.canvas is not None and self.canvas.scale != scale:
+            release_other_scales(scale)
+        self.canvas = Canvas(self.window.subsurface(self.rect), scale)
+        
+    def resize(self):
+        """Handle a window size change"""
+        self.layout()
+        
+    def toggle_fullscreen(self):
+        self.fullscreen = not self.fullscreen
+        self.open()
+        
+    def present(self, dirty=None):
+        """Show the frame: all of it, or only the dirty layout rects"""
+        if dirty is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update([self.to_window(rect) for rect in dirty])
+            
+    def to_window(self, rect):
+        """Window area covered by a layout rect"""
+        return self.canvas.bounds(rect).move(self.rect.topleft).clip(self.rect)
+        
+    def to_logical(self, pos):
+        """Layout coordinates of a window position"""
+        scale = self.canvas.scale
+        return (int((pos[0] - self.rect.x) // scale), int((pos[1] - self.rect.y) // scale))
+
+
 class Game:
-    def __init__(self):
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    def __init__(self, fullscreen=False):
+        # Only the subsystems the game uses (pygame.init() also starts joystick and others)
+        pygame.display.init()
+        pygame.font.init()
+        mark_startup("display + font init")
+        self.viewport = Viewport(fullscreen)
         pygame.display.set_caption("Flappy Osama")
         self.clock = pygame.time.Clock()
-        self.font = pygame.font.Font(None, 48)
-        self.small_font = pygame.font.Font(None, 32)
-        self.title_font = pygame.font.Font(None, 72)
+        mark_startup("window")
+        self.font = fonts.get(None, 48)
+        self.small_font = fonts.get(None, 32)
+        self.title_font = fonts.get(None, 72)
+        mark_startup("fonts")
+        
+        # Settings and modding widgets are built on first visit (see state)
+        self.menu_widgets_created = False
         
         # Game state
         self.state = HOME
@@ -454,9 +1556,14 @@ class Game:
         # High score
         self.high_score = self.load_high_score()
         
+        # Difficulty curves, compiled per set of rules
+        self.difficulty_config = load_difficulty_config()
+        self.difficulty = None
+        
         # Background transition
         self.game_time = 0  # Track time for day/night cycle
         self.cycle_duration = 60000  # Full day/night cycle in milliseconds (60 seconds)
+        self.night_sky = NightSky()
         
         # Modding parameters (editable)
         self.mod_gravity = GRAVITY
@@ -473,18 +1580,62 @@ class Game:
         self.tooltip_text = ""
         self.tooltip_visible = False
         
-        # Initialize sound mixer
+        # Fixed-timestep loop state (see run_frame)
+        self.fps = FPS
+        self.accumulator = 0.0
+        self.last_frame_time = time.perf_counter()
+        self.render_alpha = 1.0
+        
+        # Seeded runs, recording and replay
+        self.seed = None  # Fixed seed for every run (None = fresh seed per run)
+        self.record_path = None  # Also save each run's recording here
+        self.replay = None
+        self.replay_flaps = set()
+        self.precise_collision = False  # Pixel masks after the box test (--precise-collision)
+        self.pilot = flappy_core.LookaheadPilot()
+        self.autopilot = False  # A toggles the lookahead pilot while playing
+        self.autopilot_used = False  # This run was (partly) flown by the pilot
+        
+        self.startup_profile = False  # Print startup phase timings (--startup-profile)
+        
+        # Optional flappy_metrics.MetricsExporter (see --metrics-port)
+        self.metrics = None
+        
+        # Profiler overlay (F3 during play, F4 dumps CSV)
+        self.profiler = FrameProfiler()
+        self.profiler_surface = None
+        self.profiler_font = fonts.get(None, 20)
+        
+        # Menus only repaint what changed (see draw_menu)
+        self.event_driven_menus = True
+        self.menu_drawn_state = None
+        self.settings_background = None  # Built on the first settings frame at each output scale
+        self.settings_background_scale = None
+        self.menu_widget_cache = []
+        
+        mark_startup("config files")
+        
+        # Initialize sound mixer; sounds and music load in the background
         pygame.mixer.init()
-        self.load_sounds()
-        self.load_music()
+        self.start_audio_loading()
+        mark_startup("mixer init")
         
         # Load images
         self.load_images()
+        mark_startup("images")
         
         # Create buttons
         self.create_buttons()
-        
+        mark_startup("home widgets")
+        
+        self._particles = None  # Created on the first game (see particles)
+        self.particle_seed = None
+        self.pipe_pool = ObjectPool(Pipe)  # Pipes are recycled, not reallocated, across spawns and games
+        self.pipe_pool.reserve(PIPE_POOL_SIZE)
+        self.sim = None
+        self.allocation_mark = (0, 0)  # (profiled frames, entities allocated) at the last overlay refresh
         self.reset()
+        mark_startup("game setup")
         
     def create_buttons(self):
         """Create UI buttons"""
@@ -502,12 +1653,22 @@ class Game:
             "SETTINGS", (52, 152, 219), (41, 128, 185)
         )
         
+    def create_menu_widgets(self):
+        """Create the settings and modding screen widgets"""
+        self.menu_widgets_created = True
+        button_width = 240
+        button_height = 60
+        center_x = SCREEN_WIDTH // 2 - button_width // 2
+        
         # Settings screen buttons
         self.music_button = Button(
             center_x, 260, button_width, button_height,
-            "Music: ON", (241, 196, 15), (243, 156, 18)
+            f"Music: {'ON' if self.music_enabled else 'OFF'}", (241, 196, 15), (243, 156, 18)
         )
         
+        # Track picker; the settings layout has no slot for it yet
+        self.music_dropdown = None
+        
         # Volume slider
         self.volume_slider = Slider(
             100, 420, 400, 40, 0, 100, self.music_volume
@@ -557,31 +1718,74 @@ class Game:
         except Exception as e:
             print(f"[ERROR] Could not save high score: {e}")
             
-    def load_music(self):
-        """Load all available background music files"""
-        import os
+    def start_audio_loading(self):
+        """Start with silent placeholders and decode the real audio on a worker thread"""
+        self.sounds_enabled = False
+        self.flap_sound = DummySound()
+        self.score_sound = DummySound()
+        self.crash_sound = DummySound()
+        self.sfx_pool = None  # ChannelPool, created when the sounds are installed
+        self.audio_ready = threading.Event()  # Set once the worker has finished
+        self.audio_installed = False
+        self.audio_load_time = None  # Seconds the worker took
+        self.loaded_audio = None
+        threading.Thread(target=self.load_audio, name="audio-loader", daemon=True).start()
+        
+    def load_audio(self):
+        """Worker thread: decode everything, but leave playback to the main thread"""
+        start = time.perf_counter()
+        try:
+            self.loaded_audio = (self.load_sounds(), self.find_music())
+        except Exception as e:
+            print(f"[ERROR] Could not load audio: {e}")
+        self.audio_load_time = time.perf_counter() - start
+        self.audio_ready.set()
+        try:
+            pygame.event.post(pygame.event.Event(AUDIO_READY_EVENT))
+        except pygame.error:
+            pass
+        
+    def install_audio(self):
+        """Main thread: swap the placeholders for the loaded sounds and start the music"""
+        self.audio_installed = True
+        if self.loaded_audio is None:
+            return
+        (flap, score, crash, sounds_enabled), music_files = self.loaded_audio
+        self.sfx_pool = ChannelPool()
+        self.flap_sound = self.sfx_pool.voice("flap", flap)
+        self.score_sound = self.sfx_pool.voice("score", score)
+        self.crash_sound = self.sfx_pool.voice("crash", crash)
+        if self.metrics is not None:
+            self.metrics.sfx_counts = self.sfx_pool.counts
+        self.sounds_enabled = sounds_enabled
+        self.available_music = music_files
+        if music_files:
+            # mixer.music is global state, so it is only touched here on the main thread
+            self.load_music_track(0)
+        print(f"[OK] Audio ready after {self.audio_load_time * 1000:.0f} ms (loaded in the background)")
+        
+    def find_music(self):
+        """Find background music files (the main thread loads them); returns the sorted names"""
+        available_music = []
         try:
             # Scan directory for music files
-            music_extensions = ['.mp3', '.ogg', '.wav']
             for file in os.listdir('.'):
-                if any(file.lower().endswith(ext) for ext in music_extensions):
-                    self.available_music.append(file)
+                if any(file.lower().endswith(ext) for ext in MUSIC_EXTENSIONS):
+                    available_music.append(file)
             
-            if self.available_music:
+            if available_music:
                 # Sort alphabetically
-                self.available_music.sort()
-                # Load first music file
-                self.load_music_track(0)
-                print(f"[OK] Found {len(self.available_music)} music file(s)")
-                for music in self.available_music:
+                available_music.sort()
+                print(f"[OK] Found {len(available_music)} music file(s)")
+                for music in available_music:
                     print(f"  - {music}")
             else:
                 print("[WARNING] No background music file found.")
                 print("  Supported formats: .mp3, .ogg, .wav")
                 print("  Place music files in the game directory to enable background music.")
         except Exception as e:
-            print(f"[ERROR] Could not load background music: {e}")
-            self.music_loaded = False
+            print(f"[ERROR] Could not look for background music: {e}")
+        return available_music
             
     def load_music_track(self, index):
         """Load a specific music track by index"""
@@ -606,73 +1810,68 @@ class Game:
         self.airplane_image = None
         self.pipe_image = None
         
+        # Try airplane.png, then plane.png
+        airplane_file = next((name for name in AIRPLANE_IMAGE_FILES if os.path.exists(name)), None)
         try:
-            # Try to load airplane image (try both airplane.png and plane.png)
-            try:
-                img = pygame.image.load('airplane.png').convert_alpha()
-            except (pygame.error, FileNotFoundError):
-                img = pygame.image.load('plane.png').convert_alpha()
-            # Scale to appropriate size (50x30)
-            self.airplane_image = pygame.transform.scale(img, (50, 30))
+            if airplane_file is None:
+                raise FileNotFoundError(AIRPLANE_IMAGE_FILES[0])
+            # Scaled to 50x30 (cached on disk after the first launch)
+            self.airplane_image = asset_cache.load_scaled(airplane_file, *AIRPLANE_IMAGE_SIZE)
+            # Larger windows re-rasterize from the full-size file
+            sprite_cache.add_source(self.airplane_image, lambda width, height: asset_cache.load_scaled(
+                airplane_file, width, height, scaled=True))
             print("[OK] Airplane image loaded successfully")
         except (pygame.error, FileNotFoundError):
             print("[WARNING] airplane.png or plane.png not found. Using drawn graphics.")
             print("  Place 'airplane.png' or 'plane.png' in the game directory to use custom image.")
         
         try:
-            # Try to load pipe image
-            img = pygame.image.load('pipe.png').convert_alpha()
             # Scale width to PIPE_WIDTH, keep aspect ratio for height
-            aspect_ratio = img.get_height() / img.get_width()
-            pipe_height = int(PIPE_WIDTH * aspect_ratio)
-            self.pipe_image = pygame.transform.scale(img, (PIPE_WIDTH, pipe_height))
+            self.pipe_image = asset_cache.load_scaled('pipe.png', PIPE_WIDTH)
+            sprite_cache.add_source(self.pipe_image, lambda width, height: asset_cache.load_scaled(
+                'pipe.png', width, height, scaled=True))
             print("[OK] Pipe image loaded successfully")
         except (pygame.error, FileNotFoundError):
             print("[WARNING] pipe.png not found. Using drawn graphics.")
             print("  Place 'pipe.png' in the game directory to use custom image.")
         
     def load_sounds(self):
-        """Create simple sound effects using pygame.mixer"""
+        """Load sound effects from the SFX bank; returns (flap, score, crash, sounds_enabled)"""
+        bank = SfxBank()
+        
         # Try to load custom crash sound first (check both with and without space)
-        crash_sound_loaded = False
-        for name in ['crash sound', 'crash']:
-            for ext in ['.mp3', '.wav', '.ogg']:
-                try:
-                    self.crash_sound = pygame.mixer.Sound(f'{name}{ext}')
-                    self.crash_sound.set_volume(0.3)  # Set low volume (30%)
-                    print(f"[OK] Custom crash sound loaded: {name}{ext}")
-                    crash_sound_loaded = True
-                    break
-                except (pygame.error, FileNotFoundError):
-                    continue
-            if crash_sound_loaded:
+        crash_sound = None
+        for filename in CRASH_SOUND_FILES:
+            if not os.path.exists(filename):
+                continue
+            try:
+                crash_sound = bank.load_file("crash", filename)
+                crash_sound.set_volume(SFX_VOLUME)  # Set low volume (30%)
+                print(f"[OK] Custom crash sound loaded: {filename}")
                 break
-        
-        try:
-            # Try to create sounds with numpy
-            import numpy as np
-            self.flap_sound = self.create_beep_numpy(frequency=440, duration=100)
-            self.score_sound = self.create_beep_numpy(frequency=660, duration=150)
-            
+            except pygame.error:
+                continue
+        if crash_sound is None:
             # Use dummy sound if custom crash sound wasn't loaded (no beep fallback)
-            if not crash_sound_loaded:
-                self.crash_sound = DummySound()
-                print("[WARNING] Crash sound not found. Add 'crash sound.mp3' or 'crash.mp3' for crash sound.")
-            
-            self.sounds_enabled = True
-        except (ImportError, AttributeError):
+            crash_sound = DummySound()
+            print("[WARNING] Crash sound not found. Add 'crash sound.mp3' or 'crash.mp3' for crash sound.")
+        
+        # Beeps come from the cache, or are synthesized with NumPy on the first launch
+        flap_sound = bank.beep("flap", 440, 100, self.create_beep_numpy)
+        score_sound = bank.beep("score", 660, 150, self.create_beep_numpy)
+        if flap_sound is None or score_sound is None:
             # Fallback: create dummy sound objects
             print("[INFO] NumPy not available. Running without sound effects.")
             print("[INFO] To enable sounds, install numpy: pip install numpy")
-            self.sounds_enabled = False
-            self.flap_sound = DummySound()
-            self.score_sound = DummySound()
-            if not crash_sound_loaded:
-                self.crash_sound = DummySound()
+            return DummySound(), DummySound(), crash_sound, False
+        for sound in (flap_sound, score_sound):
+            sound.set_volume(SFX_VOLUME)
+        return flap_sound, score_sound, crash_sound, True
         
     def create_beep_numpy(self, frequency=440, duration=100):
-        """Generate a simple beep sound using numpy"""
-        import numpy as np
+        """Generate a simple beep sound using numpy (None without numpy)"""
+        if np is None:
+            return None
         sample_rate = 22050
         n_samples = int(round(duration * sample_rate / 1000))
         
@@ -687,102 +1886,119 @@ class Game:
         # Convert to stereo
         stereo = np.column_stack((buf, buf))
         sound = pygame.sndarray.make_sound(stereo)
-        sound.set_volume(0.3)
+        sound.set_volume(SFX_VOLUME)
         return sound
         
     def reset(self):
-        self.airplane = Airplane(self.airplane_image)
-        self.pipes = []
-        self.particles = []
-        self.score = 0
-        self.game_over = False
-        self.game_started = False
-        self.last_pipe_time = 0
-        self.current_velocity = INITIAL_PIPE_VELOCITY
-        self.current_gap = INITIAL_PIPE_GAP
+        if self.replay is not None:
+            # A replay uses the collision mode it was recorded with, whatever the command line says
+            seed, rules, precise = self.replay.seed, self.replay.rules, self.replay.precise_collision
+        else:
+            seed = self.seed if self.seed is not None else flappy_core.new_seed()
+            rules = self.make_rules()
+            precise = self.precise_collision
+        # Every run is reproducible from its seed, rules, collision mode and recorded flaps
+        self.recording = flappy_core.Recording(seed, rules, precise_collision=precise)
+        if self.sim is not None:
+            self.sim.clear_pipes()  # Back to the pool for the new game
+        self.sim = Simulation(rules, rng=random.Random(seed), airplane=Airplane(self.airplane_image),
+                              pipe_factory=self.make_pipe,
+                              recording=self.recording if self.replay is None else None,
+                              difficulty=self.make_difficulty(rules),
+                              narrow_phase=Pipe.overlaps_pixels if precise else None,
+                              pipe_release=self.pipe_pool.release)
+        self.flap_pending = False
+        self.autopilot_used = self.autopilot
+        self.particle_seed = seed
+        if self._particles is not None:
+            self._particles.clear()
+            self._particles.seed(seed)
         self.game_over_time = 0  # Track when game ended
         self.restart_cooldown = 3000  # 3 seconds cooldown in milliseconds
         
-        # Update high score if needed
-        if hasattr(self, 'high_score') and self.score > self.high_score:
-            self.high_score = self.score
-            self.save_high_score()
-        self.current_spawn_time = INITIAL_SPAWN_TIME
-        
         # Reset game time for background transition
         self.game_time = 0
         
-    def get_pipe_velocity(self):
-        """Calculate pipe velocity based on score for progressive difficulty"""
-        # Progressive speed levels
-        # Level 1-2 (0-5): Slow - 2.0 speed
-        # Level 3 (6-9): Medium - 3.5 speed
-        # Level 4 (10-14): Fast - 4.5 speed
-        # Level 5 (15-19): Very Fast - 5.5 speed
-        # Level 6-7 (20-29): Super Fast - 6.5 speed
-        # Level 8+ (30+): Maximum - 7.0-8.0 speed
-        
-        if self.score < 6:
-            return 2.0  # Level 1-2
-        elif self.score < 10:
-            return 3.5  # Level 3
-        elif self.score < 15:
-            return 4.5  # Level 4
-        elif self.score < 20:
-            return 5.5  # Level 5
-        elif self.score < 30:
-            return 6.5  # Level 6-7
-        else:
-            return min(7.0 + (self.score - 30) * 0.05, MAX_PIPE_VELOCITY)  # Level 8+ (gradually increases)
-        
-    def get_pipe_gap(self):
-        """Calculate pipe gap based on score - gets smaller as score increases"""
-        # Progressive difficulty levels based on score
-        # Level 1-2 (0-5): Very Easy - 320px gap
-        # Level 3 (6-9): Easy - 300px gap
-        # Level 4 (10-14): Medium - 280px gap
-        # Level 5 (15-19): Hard - 260px gap
-        # Level 6-7 (20-29): Very Hard - 240px gap
-        # Level 8+ (30+): Expert - 220-200px gap
-        
-        if self.score < 6:
-            return 320  # Level 1-2: Very Easy
-        elif self.score < 10:
-            return 300  # Level 3: Easy
-        elif self.score < 15:
-            return 280  # Level 4: Medium
-        elif self.score < 20:
-            return 260  # Level 5: Hard
-        elif self.score < 30:
-            return 240  # Level 6-7: Very Hard
-        else:
-            return max(230 - (self.score - 30) // 5 * 5, MIN_PIPE_GAP)  # Level 8+: Expert (gradually harder)
-        
-    def get_spawn_time(self):
-        """Calculate spawn time based on score - pipes spawn faster at higher scores"""
-        # Progressive spawn rate levels
-        # Level 1-2 (0-5): Slow - 1800ms
-        # Level 3 (6-9): Medium - 1650ms
-        # Level 4 (10-14): Fast - 1500ms
-        # Level 5 (15-19): Very Fast - 1350ms
-        # Level 6-7 (20-29): Super Fast - 1200ms
-        # Level 8+ (30+): Maximum - 1100-1000ms
-        
-        if self.score < 6:
-            return 1800  # Level 1-2
-        elif self.score < 10:
-            return 1650  # Level 3
-        elif self.score < 15:
-            return 1500  # Level 4
-        elif self.score < 20:
-            return 1350  # Level 5
-        elif self.score < 30:
-            return 1200  # Level 6-7
-        else:
-            return max(1150 - (self.score - 30) // 5 * 20, MIN_SPAWN_TIME)  # Level 8+ (gradually faster)
+    def start_replay(self, recording):
+        """Play back a recording with rendering, ignoring flap input"""
+        recording.check_difficulty(self.make_difficulty(recording.rules))
+        self.replay = recording
+        self.replay_flaps = set(recording.flaps)
+        self.state = PLAYING
+        self.reset()
         
-    def handle_events(self):
-        mouse_pos = pygame.mouse.get_pos()
+    def make_rules(self):
+        """Rules for a new game from the (possibly modded) module constants"""
+        return Rules(GRAVITY, FLAP_STRENGTH, INITIAL_PIPE_GAP, MIN_PIPE_GAP, PIPE_WIDTH,
+                     INITIAL_PIPE_VELOCITY, MAX_PIPE_VELOCITY, INITIAL_SPAWN_TIME, MIN_SPAWN_TIME)
+        
+    def make_difficulty(self, rules):
+        """Difficulty tables for these rules, recompiled only when the rules change"""
+        key = flappy_core.rules_to_tuple(rules)
+        if self.difficulty is None or flappy_core.rules_to_tuple(self.difficulty.rules) != key:
+            self.difficulty = flappy_core.Difficulty(self.difficulty_config, rules)
+        return self.difficulty
+        
+    def make_pipe(self, x, velocity, gap_size, width, rng):
+        return self.pipe_pool.acquire(x, velocity, gap_size, self.pipe_image, width, rng)
+        
+    def entity_stats(self):
+        """Live, pooled and allocated counts of pooled game objects"""
+        stats = {"pipes": self.pipe_pool.stats()}
+        if self._particles is not None:
+            stats["particles"] = self._particles.stats()
+        return stats
+        
+    def allocated_entities(self):
+        return sum(stats["allocated"] for stats in self.entity_stats().values())
+        
+    @property
+    def state(self):
+        return self._state
+    
+    @state.setter
+    def state(self, state):
+        # Build the settings/modding widgets the first time either screen opens
+        if state in (SETTINGS, MODDING) and not self.menu_widgets_created:
+            self.create_menu_widgets()
+        self._state = state
+        
+    @property
+    def particles(self):
+        """Particle system, created the first time a game needs it"""
+        if self._particles is None:
+            self._particles = create_particle_system()
+            self._particles.seed(self.particle_seed)
+        return self._particles
+        
+    # The simulation owns the game state; these keep the drawing code readable
+    @property
+    def airplane(self):
+        return self.sim.airplane
+        
+    @property
+    def pipes(self):
+        return self.sim.pipes
+        
+    @property
+    def score(self):
+        return self.sim.score
+        
+    @property
+    def screen(self):
+        """Canvas in SCREEN_WIDTH x SCREEN_HEIGHT layout units every draw_* method renders to"""
+        return self.viewport.canvas
+        
+    @property
+    def game_started(self):
+        return self.sim.started
+        
+    @property
+    def game_over(self):
+        return self.sim.over
+        
+    def handle_events(self, events=None):
+        mouse_pos = self.viewport.to_logical(pygame.mouse.get_pos())
         
         # Update button hover states
         if self.state == HOME:
@@ -797,10 +2013,16 @@ class Game:
             # Check hover for tooltips
             self.update_tooltips(mouse_pos)
         
-        for event in pygame.event.get():
+        if events is None:
+            events = pygame.event.get()
+        for event in events:
             if event.type == pygame.QUIT:
                 return False
                 
+            if event.type == pygame.VIDEORESIZE:
+                self.viewport.resize()
+                self.menu_drawn_state = None  # Repaint the whole menu at the new size
+                
             if event.type == pygame.MOUSEMOTION:
                 # Handle slider dragging
                 if self.state == SETTINGS:
@@ -841,6 +2063,7 @@ class Game:
                 if self.state == HOME:
                     if self.start_button.is_clicked(mouse_pos):
                         self.state = PLAYING
+                        self.replay = None
                         self.reset()
                     elif self.settings_button.is_clicked(mouse_pos):
                         self.state = SETTINGS
@@ -861,7 +2084,7 @@ class Game:
                         self.state = MODDING
                     elif self.back_button.is_clicked(mouse_pos):
                         self.state = HOME
-                    elif self.music_dropdown.handle_click(mouse_pos):
+                    elif self.music_dropdown is not None and self.music_dropdown.handle_click(mouse_pos):
                         # Music track changed
                         new_index = self.music_dropdown.selected_index
                         if new_index != self.current_music_index:
@@ -874,12 +2097,12 @@ class Game:
                         
                 elif self.state == PLAYING:
                     if not self.game_over:
-                        self.airplane.flap()
-                        self.game_started = True
-                        self.flap_sound.play()
+                        if self.replay is None and not self.autopilot:
+                            self.flap_pending = True
+                            self.flap_sound.play()
                     else:
                         # Check if cooldown has passed
-                        if pygame.time.get_ticks() - self.game_over_time >= self.restart_cooldown:
+                        if get_ticks() - self.game_over_time >= self.restart_cooldown:
                             self.state = HOME
                         
             if event.type == pygame.MOUSEBUTTONUP:
@@ -899,13 +2122,31 @@ class Game:
                 if event.key == pygame.K_SPACE:
                     if self.state == PLAYING:
                         if not self.game_over:
-                            self.airplane.flap()
-                            self.game_started = True
-                            self.flap_sound.play()
+                            if self.replay is None and not self.autopilot:
+                                self.flap_pending = True
+                                self.flap_sound.play()
                         else:
                             # Check if cooldown has passed
-                            if pygame.time.get_ticks() - self.game_over_time >= self.restart_cooldown:
+                            if get_ticks() - self.game_over_time >= self.restart_cooldown:
                                 self.state = HOME
+                elif event.key == pygame.K_a:
+                    if self.state == PLAYING and self.replay is None:
+                        self.autopilot = not self.autopilot
+                elif event.key == pygame.K_F3:
+                    if self.state == PLAYING:
+                        self.profiler.toggle()
+                        self.profiler_surface = None
+                elif event.key == pygame.K_F11:
+                    self.viewport.toggle_fullscreen()
+                    self.menu_drawn_state = None
+                elif event.key == pygame.K_F4:
+                    if self.profiler.history:
+                        path = time.strftime("profile_%Y%m%d_%H%M%S.csv")
+                        try:
+                            self.profiler.dump_csv(path)
+                            print(f"[OK] Wrote {len(self.profiler.history)} profiled frames to {path}")
+                        except OSError as e:
+                            print(f"[ERROR] Could not write profile: {e}")
                 elif event.key == pygame.K_ESCAPE:
                     if self.state == SETTINGS:
                         self.state = HOME
@@ -955,79 +2196,79 @@ class Game:
             return
             
         # Update particles even when game is over
-        for particle in self.particles:
-            particle.update()
-        self.particles = [p for p in self.particles if p.is_alive()]
+        self.particles.update()
         
-        # Update pipes even when game is over (for falling animation)
+        # Advance the rules one tick (pipes keep falling after game over)
+        self.airplane.save_previous()
         for pipe in self.pipes:
-            pipe.update()
+            pipe.save_previous()
+        was_over = self.game_over
+        if self.replay is not None:
+            action = self.sim.frame + 1 in self.replay_flaps
+            if action and not self.game_over:
+                self.flap_sound.play()
+        elif self.autopilot and not self.game_over:
+            action = self.pilot(self.sim)
+            self.autopilot_used = True
+            if action:
+                self.flap_sound.play()
+        else:
+            action = self.flap_pending
+        events = self.sim.step(action)
+        self.flap_pending = False
         
-        if not self.game_started or self.game_over:
+        if not self.game_started or was_over:
             return
         
         # Update game time for background transition
-        self.game_time += self.clock.get_time()
+        self.game_time += TICK_MS
+        
+        if events & flappy_core.CRASHED:
+            self.game_over_time = get_ticks()
+            self.crash_sound.play()
+            # Create explosion at collision point
+            self.create_explosion(self.airplane.x, self.airplane.y)
+            if self.replay is None:
+                self.save_recording()
+                if self.metrics is not None:
+                    self.metrics.game_finished(self.score, self.high_score)
+        if events & flappy_core.SCORED:
+            self.score_sound.play()
+        
+        # Pre-render the crash animation of the next pipe the airplane meets
+        if not self.game_over:
+            next_pipe = self.sim.next_pipe()
+            if next_pipe is not None:
+                next_pipe.warm_fall_frames(scale=self.screen.scale)
             
-        self.airplane.update()
-        
-        # Check if airplane hits ground or ceiling
-        if self.airplane.is_off_screen():
-            if not self.game_over:  # Only trigger once
-                self.game_over = True
-                self.game_over_time = pygame.time.get_ticks()
-                self.crash_sound.play()
-                self.create_explosion(self.airplane.x, self.airplane.y)
-                # Update high score
-                if self.score > self.high_score:
-                    self.high_score = self.score
-                    self.save_high_score()
-        
-        # Check collisions and scoring for each pipe
-        for pipe in self.pipes:
-            # Check collision
-            if pipe.collides_with(self.airplane):
-                if not self.game_over:  # Only trigger once
-                    self.game_over = True
-                    self.game_over_time = pygame.time.get_ticks()
-                    self.crash_sound.play()
-                    # Start pipe falling animation
-                    pipe.start_falling()
-                    # Create explosion at collision point
-                    self.create_explosion(self.airplane.x, self.airplane.y)
-                    # Update high score
-                    if self.score > self.high_score:
-                        self.high_score = self.score
-                        self.save_high_score()
-                
-            # Check if passed pipe
-            if not pipe.passed and pipe.x + PIPE_WIDTH < self.airplane.x:
-                pipe.passed = True
-                self.score += 1
-                self.score_sound.play()
-                
-        # Remove off-screen pipes
-        self.pipes = [pipe for pipe in self.pipes if not pipe.is_off_screen()]
-        
-        # Spawn new pipes with current difficulty
-        current_time = pygame.time.get_ticks()
-        self.current_spawn_time = self.get_spawn_time()
-        if current_time - self.last_pipe_time > self.current_spawn_time:
-            self.current_velocity = self.get_pipe_velocity()
-            self.current_gap = self.get_pipe_gap()
-            self.pipes.append(Pipe(SCREEN_WIDTH, self.current_velocity, self.current_gap, self.pipe_image))
-            self.last_pipe_time = current_time
+    def save_recording(self):
+        """Keep the finished run's recording and update the high score"""
+        try:
+            if self.record_path:
+                self.recording.save(self.record_path)
+            if self.score > self.high_score and not self.autopilot_used:
+                self.recording.save(HIGHSCORE_REPLAY)
+        except (OSError, struct.error) as e:
+            print(f"[ERROR] Could not save replay: {e}")
+        # Update high score (autopilot runs don't count)
+        if self.score > self.high_score and not self.autopilot_used:
+            self.high_score = self.score
+            self.save_high_score()
             
-    def create_explosion(self, x, y):
+    def create_explosion(self, x, y, count=30):
         """Create explosion particles at the given position"""
-        for _ in range(30):  # Create 30 particles
-            self.particles.append(Particle(x, y))
+        self.particles.emit(x, y, count)
             
     def apply_mods(self):
         """Apply modding parameters to game constants"""
         global GRAVITY, FLAP_STRENGTH, INITIAL_PIPE_GAP, MIN_PIPE_GAP, PIPE_WIDTH
         global INITIAL_PIPE_VELOCITY, MAX_PIPE_VELOCITY, INITIAL_SPAWN_TIME, MIN_SPAWN_TIME
         
+        # Scaled pipe sprites are sized for the old width
+        if self.mod_pipe_width != PIPE_WIDTH:
+            sprite_cache.clear()
+            mask_cache.clear()
+        
         GRAVITY = self.mod_gravity
         FLAP_STRENGTH = -self.mod_flap_strength
         INITIAL_PIPE_GAP = self.mod_initial_gap
@@ -1067,13 +2308,57 @@ class Game:
                 self.tooltip_visible = True
             
     def draw(self):
+        self.draw_screen()
+        if self.profiler.enabled and self.state == PLAYING:
+            self.draw_profiler_overlay()
+            self.profiler.mark("overlay")
+        self.viewport.present()
+        self.profiler.mark("flip")
+        
+    def draw_profiler_overlay(self):
+        """Rolling per-phase timings and object counts; the text is only re-rendered every few frames"""
+        if self.profiler_surface is None or self.profiler.frames % PROFILER_REFRESH == 0:
+            rows = self.profiler.stats()
+            entities = self.entity_stats()
+            allocated = sum(stats["allocated"] for stats in entities.values())
+            marked_frames, marked_allocated = self.allocation_mark
+            new_per_frame = (allocated - marked_allocated) / max(1, self.profiler.frames - marked_frames)
+            self.allocation_mark = (self.profiler.frames, allocated)
+            line_height = self.profiler_font.get_linesize()
+            lines = len(rows) + len(entities) + 3
+            overlay = self.screen.layer((250, line_height * lines + 8))
+            overlay.fill((0, 0, 0, 170))
+            # Fresh numbers every refresh, so the text bypasses text_cache
+            font = fonts.scaled(self.profiler_font, overlay.scale)
+            columns = (("ms", 8), ("p50", 130), ("p95", 175), ("max", 220))
+            for text, x in columns:
+                overlay.blit(font.render(text, True, YELLOW), (x, 4))
+            for i, (name, p50, p95, peak) in enumerate(rows):
+                y = 4 + line_height * (i + 1)
+                label = f"  {name}" if name in PROFILER_DRAW_PHASES else name
+                overlay.blit(font.render(label, True, WHITE), (8, y))
+                for value, (_, x) in zip((p50, p95, peak), columns[1:]):
+                    overlay.blit(font.render(f"{value:.2f}", True, WHITE), topright=(x + 28, y))
+            y = 4 + line_height * (len(rows) + 1)
+            overlay.blit(font.render("objects   live/pooled/allocated", True, YELLOW), (8, y))
+            for name, stats in entities.items():
+                y += line_height
+                text = f"{name} {stats['live']}/{stats['pooled']}/{stats['allocated']}"
+                overlay.blit(font.render(text, True, WHITE), (8, y))
+            y += line_height
+            overlay.blit(font.render(f"new objects/frame {new_per_frame:.2f}", True, WHITE), (8, y))
+            self.profiler_surface = overlay.surface
+        self.screen.blit(self.profiler_surface, (10, 40))
+        
+    def draw_screen(self):
+        """Render the current state to the back buffer without presenting it"""
         # Draw sky with dynamic color based on game state
         if self.state == PLAYING:
             # Use dynamic day/night cycle during gameplay
             bg_color = self.get_background_color()
             self.screen.fill(bg_color)
-        else:
-            # Use default sky blue for menus
+        elif self.state != SETTINGS:
+            # Use default sky blue for menus (the settings background has its own)
             self.screen.fill(SKY_BLUE)
         
         if self.state == HOME:
@@ -1085,75 +2370,134 @@ class Game:
         elif self.state == PLAYING:
             self.draw_game_screen()
             
-        pygame.display.flip()
+    def menu_widget_states(self):
+        """Return (rect, visual state) for everything that can change on a menu"""
+        if self.state == HOME:
+            return [
+                (self.start_button.rect, self.start_button.is_hovered),
+                (self.settings_button.rect, self.settings_button.is_hovered),
+            ]
+        elif self.state == SETTINGS:
+            return [
+                (self.music_button.rect, (self.music_button.is_hovered, self.music_button.text)),
+                (self.modding_button.rect, self.modding_button.is_hovered),
+                (self.back_button.rect, self.back_button.is_hovered),
+                (self.volume_slider.get_rect(), self.volume_slider.value),
+                # Music status line; audio can finish installing while the screen is open
+                (pygame.Rect(0, 720, SCREEN_WIDTH, self.small_font.get_linesize()),
+                 (self.music_loaded, len(self.available_music))),
+            ]
+        elif self.state == MODDING:
+            states = [
+                (self.modding_back_button.rect, self.modding_back_button.is_hovered),
+                (pygame.Rect(50, 140, 500, 70), (self.tooltip_visible, self.tooltip_text)),
+            ]
+            for slider in self.modding_sliders():
+                # Row covers the label, slider and value text above it
+                row = pygame.Rect(0, slider.y - 25, SCREEN_WIDTH, slider.height + 25)
+                states.append((row, slider.value))
+            return states
+        return []
+        
+    def modding_sliders(self):
+        return [self.gravity_slider, self.flap_slider, self.initial_gap_slider, self.min_gap_slider,
+                self.pipe_width_slider, self.initial_vel_slider, self.max_vel_slider]
+        
+    def draw_menu(self):
+        """Repaint only the menu regions whose widgets changed since the last frame"""
+        widget_states = self.menu_widget_states()
+        if self.menu_drawn_state != self.state or len(widget_states) != len(self.menu_widget_cache):
+            # New screen: paint everything once
+            self.draw()
+        else:
+            dirty = [rect for (rect, visual), (_, old_visual) in zip(widget_states, self.menu_widget_cache)
+                     if visual != old_visual]
+            if dirty:
+                self.screen.set_clip(dirty[0].unionall(dirty[1:]))
+                self.draw_screen()
+                self.screen.set_clip(None)
+                self.viewport.present(dirty)
+        self.menu_drawn_state = self.state
+        self.menu_widget_cache = widget_states
         
     def draw_home_screen(self):
         """Draw the home screen with title and buttons"""
         # Draw title
-        title_text = self.title_font.render("FLAPPY", True, WHITE)
-        title_text2 = self.title_font.render("OSAMA", True, YELLOW)
-        title_outline = self.title_font.render("FLAPPY", True, BLACK)
-        title_outline2 = self.title_font.render("OSAMA", True, BLACK)
+        title_text = self.screen.text(self.title_font, "FLAPPY", WHITE)
+        title_text2 = self.screen.text(self.title_font, "OSAMA", YELLOW)
+        title_outline = self.screen.text(self.title_font, "FLAPPY", BLACK)
+        title_outline2 = self.screen.text(self.title_font, "OSAMA", BLACK)
         
-        self.screen.blit(title_outline, (SCREEN_WIDTH // 2 - title_text.get_width() // 2 + 3, 153))
-        self.screen.blit(title_text, (SCREEN_WIDTH // 2 - title_text.get_width() // 2, 150))
-        self.screen.blit(title_outline2, (SCREEN_WIDTH // 2 - title_text2.get_width() // 2 + 3, 233))
-        self.screen.blit(title_text2, (SCREEN_WIDTH // 2 - title_text2.get_width() // 2, 230))
+        self.screen.blit(title_outline, midtop=(SCREEN_WIDTH // 2 + 3, 153))
+        self.screen.blit(title_text, midtop=(SCREEN_WIDTH // 2, 150))
+        self.screen.blit(title_outline2, midtop=(SCREEN_WIDTH // 2 + 3, 233))
+        self.screen.blit(title_text2, midtop=(SCREEN_WIDTH // 2, 230))
         
         # Draw airplane preview
         if self.airplane_image:
-            preview_img = pygame.transform.scale(self.airplane_image, (140, 84))
+            preview_img = self.screen.sprite(self.airplane_image, 140, 84)
             self.screen.blit(preview_img, (SCREEN_WIDTH // 2 - 70, 320))
         
         # Draw high score
-        highscore_label = self.small_font.render("HIGH SCORE", True, YELLOW)
-        highscore_value = self.font.render(str(self.high_score), True, WHITE)
-        highscore_outline = self.font.render(str(self.high_score), True, BLACK)
+        highscore_label = self.screen.text(self.small_font, "HIGH SCORE", YELLOW)
+        highscore_value = self.screen.text(self.font, str(self.high_score), WHITE)
+        highscore_outline = self.screen.text(self.font, str(self.high_score), BLACK)
         
-        self.screen.blit(highscore_label, (SCREEN_WIDTH // 2 - highscore_label.get_width() // 2, 600))
-        self.screen.blit(highscore_outline, (SCREEN_WIDTH // 2 - highscore_value.get_width() // 2 + 2, 642))
-        self.screen.blit(highscore_value, (SCREEN_WIDTH // 2 - highscore_value.get_width() // 2, 640))
+        self.screen.blit(highscore_label, midtop=(SCREEN_WIDTH // 2, 600))
+        self.screen.blit(highscore_outline, midtop=(SCREEN_WIDTH // 2 + 2, 642))
+        self.screen.blit(highscore_value, midtop=(SCREEN_WIDTH // 2, 640))
         
         # Draw buttons
         self.start_button.draw(self.screen, self.small_font)
         self.settings_button.draw(self.screen, self.small_font)
         
         # Draw footer
-        footer_text = self.small_font.render("Press ESC to quit", True, WHITE)
-        self.screen.blit(footer_text, (SCREEN_WIDTH // 2 - footer_text.get_width() // 2, 720))
+        footer_text = self.screen.text(self.small_font, "Press ESC to quit", WHITE)
+        self.screen.blit(footer_text, midtop=(SCREEN_WIDTH // 2, 720))
+        
+    def render_settings_background(self):
+        """Sky, panels, title, gear icon and section labels of the settings screen in one surface"""
+        background = self.screen.layer((SCREEN_WIDTH, SCREEN_HEIGHT), alpha=False)
+        background.fill(SKY_BLUE)
         
-    def draw_settings_screen(self):
-        """Draw the settings screen"""
         # Draw decorative background panels
         panel_color = (44, 62, 80)
-        pygame.draw.rect(self.screen, panel_color, (40, 230, 520, 110), border_radius=15)
-        pygame.draw.rect(self.screen, panel_color, (40, 360, 520, 130), border_radius=15)
-        pygame.draw.rect(self.screen, panel_color, (40, 510, 520, 130), border_radius=15)
+        background.draw_rect(panel_color, (40, 230, 520, 110), border_radius=15)
+        background.draw_rect(panel_color, (40, 360, 520, 130), border_radius=15)
+        background.draw_rect(panel_color, (40, 510, 520, 130), border_radius=15)
         
         # Draw title with icon
-        title_text = self.font.render("SETTINGS", True, WHITE)
-        title_outline = self.font.render("SETTINGS", True, BLACK)
-        self.screen.blit(title_outline, (SCREEN_WIDTH // 2 - title_text.get_width() // 2 + 2, 72))
-        self.screen.blit(title_text, (SCREEN_WIDTH // 2 - title_text.get_width() // 2, 70))
+        title_text = background.text(self.font, "SETTINGS", WHITE)
+        title_outline = background.text(self.font, "SETTINGS", BLACK)
+        background.blit(title_outline, midtop=(SCREEN_WIDTH // 2 + 2, 72))
+        background.blit(title_text, midtop=(SCREEN_WIDTH // 2, 70))
         
         # Draw gear icon (simple)
         gear_center = (SCREEN_WIDTH // 2, 160)
-        pygame.draw.circle(self.screen, (189, 195, 199), gear_center, 30, 4)
-        pygame.draw.circle(self.screen, (189, 195, 199), gear_center, 15)
+        background.draw_circle((189, 195, 199), gear_center, 30, 4)
+        background.draw_circle((189, 195, 199), gear_center, 15)
         
         # Section 1: Music Toggle
-        section1_label = self.small_font.render("Music Control", True, (189, 195, 199))
-        self.screen.blit(section1_label, (60, 240))
-        
-        self.music_button.draw(self.screen, self.small_font)
+        section1_label = background.text(self.small_font, "Music Control", (189, 195, 199))
+        background.blit(section1_label, (60, 240))
         
         # Section 2: Volume Control
-        section2_label = self.small_font.render("Volume Control", True, (189, 195, 199))
-        self.screen.blit(section2_label, (60, 370))
+        section2_label = background.text(self.small_font, "Volume Control", (189, 195, 199))
+        background.blit(section2_label, (60, 370))
         
-        volume_label = self.small_font.render("Volume:", True, WHITE)
-        self.screen.blit(volume_label, (100, 425))
+        volume_label = background.text(self.small_font, "Volume:", WHITE)
+        background.blit(volume_label, (100, 425))
+        return background.surface
         
+    def draw_settings_screen(self):
+        """Draw the settings screen"""
+        # Static chrome is composited once; only the widgets are drawn on top
+        if self.settings_background_scale != self.screen.scale:
+            self.settings_background = self.render_settings_background()
+            self.settings_background_scale = self.screen.scale
+        self.screen.blit(self.settings_background, (0, 0))
+        
+        self.music_button.draw(self.screen, self.small_font)
         self.volume_slider.draw(self.screen, self.small_font)
         
         # Draw modding button
@@ -1164,24 +2508,25 @@ class Game:
         
         # Draw music status at bottom
         if self.music_loaded:
-            status_text = self.small_font.render(f"{len(self.available_music)} track(s) available", True, (46, 204, 113))
+            status_text = self.screen.text(self.small_font, f"{len(self.available_music)} track(s) available",
+                                           (46, 204, 113))
         else:
-            status_text = self.small_font.render("No music files found", True, GRAY)
-        self.screen.blit(status_text, (SCREEN_WIDTH // 2 - status_text.get_width() // 2, 720))
+            status_text = self.screen.text(self.small_font, "No music files found", GRAY)
+        self.screen.blit(status_text, midtop=(SCREEN_WIDTH // 2, 720))
         
     def draw_modding_screen(self):
         """Draw the modding/customization screen"""
         # Draw title
-        title_text = self.font.render("MODDING", True, (155, 89, 182))
-        title_outline = self.font.render("MODDING", True, BLACK)
-        self.screen.blit(title_outline, (SCREEN_WIDTH // 2 - title_text.get_width() // 2 + 2, 52))
-        self.screen.blit(title_text, (SCREEN_WIDTH // 2 - title_text.get_width() // 2, 50))
+        title_text = self.screen.text(self.font, "MODDING", (155, 89, 182))
+        title_outline = self.screen.text(self.font, "MODDING", BLACK)
+        self.screen.blit(title_outline, midtop=(SCREEN_WIDTH // 2 + 2, 52))
+        self.screen.blit(title_text, midtop=(SCREEN_WIDTH // 2, 50))
         
-        subtitle = self.small_font.render("Customize Game Parameters", True, WHITE)
-        self.screen.blit(subtitle, (SCREEN_WIDTH // 2 - subtitle.get_width() // 2, 100))
+        subtitle = self.screen.text(self.small_font, "Customize Game Parameters", WHITE)
+        self.screen.blit(subtitle, midtop=(SCREEN_WIDTH // 2, 100))
         
         # Draw parameter labels and sliders
-        param_font = pygame.font.Font(None, 28)
+        param_font = fonts.get(None, 28)
         
         params = [
             ("Gravity:", self.gravity_slider, f"{self.mod_gravity:.2f}", 240),
@@ -1195,23 +2540,23 @@ class Game:
         
         for label, slider, value, y_pos in params:
             # Draw label
-            label_text = param_font.render(label, True, WHITE)
+            label_text = self.screen.text(param_font, label, WHITE)
             self.screen.blit(label_text, (100, y_pos - 25))
             
             # Draw slider
             slider.draw(self.screen, param_font)
             
             # Draw value
-            value_text = param_font.render(value, True, (46, 204, 113))
+            value_text = self.screen.text(param_font, value, (46, 204, 113))
             self.screen.blit(value_text, (520, y_pos - 25))
         
         # Draw tooltip if visible
         if self.tooltip_visible:
             tooltip_bg = pygame.Rect(50, 140, 500, 70)
-            pygame.draw.rect(self.screen, (44, 62, 80), tooltip_bg, border_radius=10)
-            pygame.draw.rect(self.screen, (155, 89, 182), tooltip_bg, 3, border_radius=10)
+            self.screen.draw_rect((44, 62, 80), tooltip_bg, border_radius=10)
+            self.screen.draw_rect((155, 89, 182), tooltip_bg, 3, border_radius=10)
             
-            tooltip_surface = self.small_font.render(self.tooltip_text, True, WHITE)
+            tooltip_surface = self.screen.text(self.small_font, self.tooltip_text, WHITE)
             self.screen.blit(tooltip_surface, (70, 165))
         
         # Draw back button
@@ -1232,49 +2577,7 @@ class Game:
             else:  # Full night
                 alpha = 255
             
-            # Draw stars
-            star_positions = [
-                (100, 80), (180, 120), (280, 90), (380, 110), (480, 70),
-                (150, 180), (320, 160), (450, 200), (220, 240), (520, 150),
-                (80, 300), (200, 350), (350, 320), (500, 380), (140, 420),
-                (420, 280), (560, 240), (90, 500), (300, 480), (470, 520)
-            ]
-            
-            for star_x, star_y in star_positions:
-                # Twinkling effect
-                twinkle = abs((self.game_time // 300 + star_x) % 100 - 50) / 50
-                star_alpha = int(alpha * (0.5 + 0.5 * twinkle))
-                
-                # Create star surface with alpha
-                star_surface = pygame.Surface((6, 6), pygame.SRCALPHA)
-                star_color = (255, 255, 255, star_alpha)
-                
-                # Draw star shape (cross pattern)
-                pygame.draw.circle(star_surface, star_color, (3, 3), 2)
-                pygame.draw.line(star_surface, star_color, (3, 0), (3, 6), 1)
-                pygame.draw.line(star_surface, star_color, (0, 3), (6, 3), 1)
-                
-                self.screen.blit(star_surface, (star_x, star_y))
-            
-            # Draw moon
-            moon_x = 480
-            moon_y = 120
-            moon_radius = 35
-            
-            # Create moon surface with alpha
-            moon_surface = pygame.Surface((moon_radius * 2 + 10, moon_radius * 2 + 10), pygame.SRCALPHA)
-            moon_color = (240, 240, 200, alpha)  # Pale yellow
-            
-            # Draw moon circle
-            pygame.draw.circle(moon_surface, moon_color, (moon_radius + 5, moon_radius + 5), moon_radius)
-            
-            # Draw craters for detail
-            crater_color = (200, 200, 180, alpha // 2)
-            pygame.draw.circle(moon_surface, crater_color, (moon_radius - 5, moon_radius), 6)
-            pygame.draw.circle(moon_surface, crater_color, (moon_radius + 10, moon_radius + 8), 4)
-            pygame.draw.circle(moon_surface, crater_color, (moon_radius + 5, moon_radius - 8), 5)
-            
-            self.screen.blit(moon_surface, (moon_x - moon_radius - 5, moon_y - moon_radius - 5))
+            self.night_sky.draw(self.screen, alpha, self.game_time)
         
         # Draw clouds (visible during day, less visible at night)
         cloud_alpha = 255
@@ -1282,151 +2585,266 @@ class Game:
             cloud_alpha = 100
         
         for i in range(3):
-            x = (i * 200 + pygame.time.get_ticks() // 50) % (SCREEN_WIDTH + 100)
+            x = (i * 200 + get_ticks() // 50) % (SCREEN_WIDTH + 100)
             if cloud_alpha < 255:
                 # Draw darker clouds at night
-                cloud_surface = pygame.Surface((150, 50), pygame.SRCALPHA)
-                cloud_color = (200, 200, 200, cloud_alpha)
-                pygame.draw.ellipse(cloud_surface, cloud_color, (0, 10, 80, 40))
-                pygame.draw.ellipse(cloud_surface, cloud_color, (20, 0, 60, 40))
-                pygame.draw.ellipse(cloud_surface, cloud_color, (40, 10, 70, 35))
-                self.screen.blit(cloud_surface, (x, 50 + i * 80))
+                self.screen.blit(self.night_sky.cloud(self.screen), (x, 50 + i * 80))
             else:
                 # Draw normal white clouds during day
-                pygame.draw.ellipse(self.screen, WHITE, (x, 50 + i * 80, 80, 40))
-                pygame.draw.ellipse(self.screen, WHITE, (x + 20, 40 + i * 80, 60, 40))
-                pygame.draw.ellipse(self.screen, WHITE, (x + 40, 50 + i * 80, 70, 35))
+                self.screen.draw_ellipse(WHITE, (x, 50 + i * 80, 80, 40))
+                self.screen.draw_ellipse(WHITE, (x + 20, 40 + i * 80, 60, 40))
+                self.screen.draw_ellipse(WHITE, (x + 40, 50 + i * 80, 70, 35))
+        self.profiler.mark("sky")
         
         # Draw pipes
         for pipe in self.pipes:
-            pipe.draw(self.screen)
+            pipe.draw(self.screen, self.render_alpha)
+        self.profiler.mark("pipes")
             
         # Draw airplane (only if not exploded or still showing particles)
         if not self.game_over or len(self.particles) == 0:
-            self.airplane.draw(self.screen)
+            self.airplane.draw(self.screen, self.render_alpha)
+        self.profiler.mark("airplane")
         
         # Draw explosion particles
-        for particle in self.particles:
-            particle.draw(self.screen)
+        self.particles.draw(self.screen)
+        self.profiler.mark("particles")
         
         # Draw score
-        score_text = self.font.render(str(self.score), True, WHITE)
-        score_outline = self.font.render(str(self.score), True, BLACK)
-        self.screen.blit(score_outline, (SCREEN_WIDTH // 2 - score_text.get_width() // 2 + 2, 52))
-        self.screen.blit(score_text, (SCREEN_WIDTH // 2 - score_text.get_width() // 2, 50))
+        score_text = self.screen.text(self.font, str(self.score), WHITE)
+        score_outline = self.screen.text(self.font, str(self.score), BLACK)
+        self.screen.blit(score_outline, midtop=(SCREEN_WIDTH // 2 + 2, 52))
+        self.screen.blit(score_text, midtop=(SCREEN_WIDTH // 2, 50))
         
         # Draw difficulty indicator with level
         if self.game_started and self.score >= 0:
-            # Determine current level with more detailed progression
-            if self.score < 3:
-                level = 1
-                level_name = "Beginner"
-            elif self.score < 6:
-                level = 2
-                level_name = "Novice"
-            elif self.score < 10:
-                level = 3
-                level_name = "Apprentice"
-            elif self.score < 15:
-                level = 4
-                level_name = "Skilled"
-            elif self.score < 20:
-                level = 5
-                level_name = "Advanced"
-            elif self.score < 25:
-                level = 6
-                level_name = "Expert"
-            elif self.score < 30:
-                level = 7
-                level_name = "Master"
-            elif self.score < 35:
-                level = 8
-                level_name = "Elite"
-            elif self.score < 40:
-                level = 9
-                level_name = "Champion"
-            elif self.score < 50:
-                level = 10
-                level_name = "Legend"
-            elif self.score < 60:
-                level = 11
-                level_name = "Mythic"
-            elif self.score < 75:
-                level = 12
-                level_name = "Godlike"
-            elif self.score < 100:
-                level = 13
-                level_name = "Immortal"
-            else:
-                level = 14 + (self.score - 100) // 20
-                level_name = "Transcendent"
+            level, level_name = self.sim.difficulty.level(self.score)
             
-            difficulty_text = self.small_font.render(f"Lv.{level}: {level_name}", True, WHITE)
-            difficulty_outline = self.small_font.render(f"Lv.{level}: {level_name}", True, BLACK)
+            difficulty_text = self.screen.text(self.small_font, f"Lv.{level}: {level_name}", WHITE)
+            difficulty_outline = self.screen.text(self.small_font, f"Lv.{level}: {level_name}", BLACK)
             self.screen.blit(difficulty_outline, (12, 12))
             self.screen.blit(difficulty_text, (10, 10))
         
+        if self.replay is not None:
+            replay_text = self.screen.text(self.small_font, "REPLAY", YELLOW)
+            self.screen.blit(replay_text, topright=(SCREEN_WIDTH - 10, 10))
+        elif self.autopilot:
+            autopilot_text = self.screen.text(self.small_font, "AUTOPILOT", YELLOW)
+            self.screen.blit(autopilot_text, topright=(SCREEN_WIDTH - 10, 10))
+        
         # Draw instructions or game over
         if not self.game_started:
-            instruction_text = self.small_font.render("Press SPACE or Click to Fly", True, WHITE)
-            instruction_outline = self.small_font.render("Press SPACE or Click to Fly", True, BLACK)
-            self.screen.blit(instruction_outline, 
-                           (SCREEN_WIDTH // 2 - instruction_text.get_width() // 2 + 2, 
-                            SCREEN_HEIGHT // 2 + 52))
-            self.screen.blit(instruction_text, 
-                           (SCREEN_WIDTH // 2 - instruction_text.get_width() // 2, 
-                            SCREEN_HEIGHT // 2 + 50))
+            instruction_text = self.screen.text(self.small_font, "Press SPACE or Click to Fly", WHITE)
+            instruction_outline = self.screen.text(self.small_font, "Press SPACE or Click to Fly", BLACK)
+            self.screen.blit(instruction_outline, midtop=(SCREEN_WIDTH // 2 + 2, SCREEN_HEIGHT // 2 + 52))
+            self.screen.blit(instruction_text, midtop=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 50))
         elif self.game_over:
-            game_over_text = self.font.render("GAME OVER", True, RED)
-            game_over_outline = self.font.render("GAME OVER", True, BLACK)
-            self.screen.blit(game_over_outline, 
-                           (SCREEN_WIDTH // 2 - game_over_text.get_width() // 2 + 2, 
-                            SCREEN_HEIGHT // 2 + 2))
-            self.screen.blit(game_over_text, 
-                           (SCREEN_WIDTH // 2 - game_over_text.get_width() // 2, 
-                            SCREEN_HEIGHT // 2))
+            game_over_text = self.screen.text(self.font, "GAME OVER", RED)
+            game_over_outline = self.screen.text(self.font, "GAME OVER", BLACK)
+            self.screen.blit(game_over_outline, midtop=(SCREEN_WIDTH // 2 + 2, SCREEN_HEIGHT // 2 + 2))
+            self.screen.blit(game_over_text, midtop=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
             
             # Calculate remaining cooldown time
-            time_elapsed = pygame.time.get_ticks() - self.game_over_time
+            time_elapsed = get_ticks() - self.game_over_time
             time_remaining = max(0, self.restart_cooldown - time_elapsed)
             
             if time_remaining > 0:
                 # Show countdown timer
                 seconds_left = int(time_remaining / 1000) + 1
-                countdown_text = self.small_font.render(f"Restarting in {seconds_left}...", True, YELLOW)
-                countdown_outline = self.small_font.render(f"Restarting in {seconds_left}...", True, BLACK)
-                self.screen.blit(countdown_outline, 
-                               (SCREEN_WIDTH // 2 - countdown_text.get_width() // 2 + 2, 
-                                SCREEN_HEIGHT // 2 + 62))
-                self.screen.blit(countdown_text, 
-                               (SCREEN_WIDTH // 2 - countdown_text.get_width() // 2, 
-                                SCREEN_HEIGHT // 2 + 60))
+                countdown_text = self.screen.text(self.small_font, f"Restarting in {seconds_left}...", YELLOW)
+                countdown_outline = self.screen.text(self.small_font, f"Restarting in {seconds_left}...", BLACK)
+                self.screen.blit(countdown_outline, midtop=(SCREEN_WIDTH // 2 + 2, SCREEN_HEIGHT // 2 + 62))
+                self.screen.blit(countdown_text, midtop=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 60))
             else:
                 # Show restart instruction
-                restart_text = self.small_font.render("Press SPACE or Click to Restart", True, WHITE)
-                restart_outline = self.small_font.render("Press SPACE or Click to Restart", True, BLACK)
-                self.screen.blit(restart_outline, 
-                               (SCREEN_WIDTH // 2 - restart_text.get_width() // 2 + 2, 
-                                SCREEN_HEIGHT // 2 + 62))
-                self.screen.blit(restart_text, 
-                               (SCREEN_WIDTH // 2 - restart_text.get_width() // 2, 
-                                SCREEN_HEIGHT // 2 + 60))
+                restart_text = self.screen.text(self.small_font, "Press SPACE or Click to Restart", WHITE)
+                restart_outline = self.screen.text(self.small_font, "Press SPACE or Click to Restart", BLACK)
+                self.screen.blit(restart_outline, midtop=(SCREEN_WIDTH // 2 + 2, SCREEN_HEIGHT // 2 + 62))
+                self.screen.blit(restart_text, midtop=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 60))
+        self.profiler.mark("hud")
+        
+    def run_frame(self):
+        """Run one iteration of the main loop, returning False to quit"""
+        if self.event_driven_menus and self.state in (HOME, SETTINGS, MODDING):
+            # Static menus sleep until input arrives instead of polling at FPS
+            event = pygame.event.wait(MENU_IDLE_TIMEOUT)
+            events = [] if event.type == pygame.NOEVENT else [event]
+            events.extend(pygame.event.get())
+            if not self.audio_installed and self.audio_ready.is_set():
+                self.install_audio()
+            if any(e.type in (pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED) for e in events):
+                self.menu_drawn_state = None
+            running = self.handle_events(events)
+            self.update()
+            if self.state in (HOME, SETTINGS, MODDING):
+                self.draw_menu()
+            else:
+                self.menu_drawn_state = None
+                self.draw()
+            self.clock.tick()
+            if self.metrics is not None:
+                self.metrics.set_state(STATE_NAMES[self.state])
+            self.last_frame_time = time.perf_counter()
+            return running
+        
+        self.profiler.begin_frame()
+        if not self.audio_installed and self.audio_ready.is_set():
+            self.install_audio()
+        running = self.handle_events()
+        self.profiler.mark("events")
+        
+        # Fixed-timestep physics: run as many ticks as real time has covered
+        now = time.perf_counter()
+        self.accumulator += min((now - self.last_frame_time) * 1000, MAX_FRAME_TIME)
+        self.last_frame_time = now
+        while self.accumulator >= TICK_MS:
+            self.update()
+            self.accumulator -= TICK_MS
+        self.profiler.mark("update")
+        
+        # Render between the last two ticks
+        self.render_alpha = self.accumulator / TICK_MS
+        self.draw()
+        self.menu_drawn_state = None
+        frame_ms = self.clock.tick(self.fps)
+        self.profiler.mark("wait")
+        if self.metrics is not None:
+            self.report_frame(frame_ms)
+        self.profiler.end_frame()
+        return running
+        
+    def report_frame(self, frame_ms):
+        """Pass the frame time and state to the metrics exporter"""
+        state = GAME_OVER if self.state == PLAYING and self.game_over else self.state
+        self.metrics.set_state(STATE_NAMES[state])
+        self.metrics.observe_frame(frame_ms, self.clock.get_fps(), 1000 / (self.fps or FPS))
         
     def run(self):
+        # Show the first frame right away rather than after the first input wait
+        if self.event_driven_menus and self.state in (HOME, SETTINGS, MODDING):
+            self.draw_menu()
+        else:
+            self.draw()
+        mark_startup("first frame")
+        if self.startup_profile:
+            print_startup_profile()
+        print(f"[INFO] First frame drawn {(time.perf_counter() - LAUNCH_TIME) * 1000:.0f} ms after launch")
         running = True
         while running:
-            running = self.handle_events()
-            self.update()
-            self.draw()
-            self.clock.tick(FPS)
+            running = self.run_frame()
             
+        if self.sfx_pool is not None:
+            self.sfx_pool.report()
         pygame.quit()
         sys.exit()
+        
+    def measure_idle_cpu(self, seconds):
+        """Idle on the home screen and return CPU usage (%) per menu mode"""
+        results = {}
+        for event_driven in (False, True):
+            self.event_driven_menus = event_driven
+            self.state = HOME
+            self.menu_drawn_state = None
+            start_wall = time.perf_counter()
+            start_cpu = time.process_time()
+            while time.perf_counter() - start_wall < seconds:
+                self.run_frame()
+            wall = time.perf_counter() - start_wall
+            cpu = time.process_time() - start_cpu
+            results["event-driven" if event_driven else "polling"] = 100 * cpu / wall
+        return results
+
+
+def parse_seed(text):
+    try:
+        seed = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid seed: {text!r}")
+    if not 0 <= seed <= flappy_core.MAX_SEED:
+        raise argparse.ArgumentTypeError(f"seed must be between 0 and {flappy_core.MAX_SEED} (replays store 64 bits)")
+    return seed
 
 
 def main():
-    game = Game()
-    game.run()
+    parser = argparse.ArgumentParser(description="Flappy Osama")
+    parser.add_argument("--polling-menus", action="store_true",
+                        help="redraw menus every frame instead of only when input changes them")
+    parser.add_argument("--fps", type=int, default=FPS,
+                        help=f"render frame cap, 0 for uncapped (default {FPS}); physics stays at {TICK_RATE} ticks/s")
+    parser.add_argument("--measure-idle-cpu", type=float, metavar="SECONDS",
+                        help="report idle CPU usage on the home screen for both menu modes and exit")
+    parser.add_argument("--seed", type=parse_seed, help="use this RNG seed for every run (0 to 2**64 - 1)")
+    parser.add_argument("--record", metavar="FILE", help="save each run's input recording to FILE")
+    parser.add_argument("--replay", metavar="FILE", help="play back a recording")
+    parser.add_argument("--headless", action="store_true",
+                        help="with --replay: verify the recording without a window, as fast as possible")
+    parser.add_argument("--metrics-port", type=int, metavar="PORT",
+                        help="serve Prometheus metrics on http://127.0.0.1:PORT/metrics")
+    parser.add_argument("--metrics-file", metavar="FILE",
+                        help="periodically rewrite FILE with Prometheus metrics")
+    parser.add_argument("--metrics-interval", type=float, default=15.0, metavar="SECONDS",
+                        help="seconds between --metrics-file rewrites (default 15)")
+    parser.add_argument("--startup-profile", action="store_true",
+                        help="print how long each startup phase took up to the first frame")
+    parser.add_argument("--fullscreen", action="store_true",
+                        help="start fullscreen, scaled to the display (F11 toggles)")
+    parser.add_argument("--precise-collision", action="store_true",
+                        help="only crash when opaque sprite pixels touch, not just the collision boxes")
+    args = parser.parse_args()
+    mark_startup("arguments")
+    if args.replay and args.headless:
+        difficulty_config = load_difficulty_config()
+        recording = None
+        try:
+            recording = flappy_core.Recording.load(args.replay)
+            start = time.perf_counter()
+            ok = flappy_core.verify(recording, difficulty_config)
+        except (OSError, ValueError) as e:
+            print(f"[ERROR] Cannot verify {args.replay}: {e}")
+            if recording is not None and recording.precise_collision:
+                print(f"  Play it back without --headless: python flappy_airplane.py --replay {args.replay}")
+            pygame.quit()
+            sys.exit(1)
+        elapsed = time.perf_counter() - start
+        if ok:
+            print(f"[OK] Replay verified: score {recording.score} over {recording.frames} ticks ({elapsed:.3f}s)")
+        else:
+            print(f"[ERROR] Replay does not reproduce its recorded score of {recording.score}")
+        pygame.quit()
+        sys.exit(0 if ok else 1)
+    
+    game = Game(args.fullscreen)
+    game.event_driven_menus = not args.polling_menus
+    game.fps = args.fps
+    game.seed = args.seed
+    game.record_path = args.record
+    game.startup_profile = args.startup_profile
+    game.precise_collision = args.precise_collision
+    if args.measure_idle_cpu:
+        for mode, usage in game.measure_idle_cpu(args.measure_idle_cpu).items():
+            print(f"[INFO] Idle CPU ({mode} menus): {usage:.1f}%")
+        pygame.quit()
+        return
+    if args.replay:
+        try:
+            game.start_replay(flappy_core.Recording.load(args.replay))
+        except (OSError, ValueError) as e:
+            print(f"[ERROR] Cannot replay {args.replay}: {e}")
+            pygame.quit()
+            sys.exit(1)
+    if args.metrics_port is not None or args.metrics_file:
+        import flappy_metrics
+        game.metrics = flappy_metrics.MetricsExporter(
+            [STATE_NAMES[state] for state in (HOME, PLAYING, GAME_OVER, SETTINGS, MODDING)],
+            port=args.metrics_port, path=args.metrics_file, interval=args.metrics_interval)
+        game.metrics.set_state(STATE_NAMES[game.state])
+        game.metrics.start()
+    try:
+        game.run()
+    finally:
+        # Final file write so the last games are not lost on quit
+        if game.metrics is not None:
+            game.metrics.stop()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,284 @@
+"""Frame-time benchmarks for Flappy Osama.
+
+Runs Game.update and Game.draw_screen (which calls draw_game_screen)
+headless under the SDL dummy drivers for a set of scripted scenarios and
+reports mean, p95 and p99 frame times. Results can be saved as a JSON
+baseline and later runs compared against it:
+
+    python flappy_bench.py --save baseline.json
+    python flappy_bench.py --compare baseline.json --threshold 0.10
+
+--collision precise times the pixel-mask collision mode instead (results
+are stored as "<scenario>+precise"), and --collision both runs each
+scenario in both modes and prints the difference.
+
+--resolution 1080x1920 additionally renders each scenario natively into
+a window of that size, as the game does at any window size, and includes
+presenting the frame in the timing (stored as "<scenario>@1080x1920").
+The native 600x800 runs always come first, so --collision both still
+compares the two modes.
+
+The exit status is 1 when any scenario regressed past the threshold.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+# Must be set before pygame creates the window and mixer
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+import flappy_core
+import flappy_airplane as game_module
+from flappy_core import INITIAL_PIPE_VELOCITY, MIN_SPAWN_TIME, PIPE_WIDTH, SCREEN_WIDTH, TICK_RATE
+
+BENCH_SEED = 1  # Same pipes every run
+WARMUP_FRAMES = 60  # Frames run before timing starts (cache warm-up)
+CRASH_FRAMES = 150  # Frames of falling pipes and explosion timed per crash
+PARTICLE_BURST = 60  # Particles emitted per frame (~3600 alive at once)
+
+
+def start_run(game):
+    """Start a fresh, seeded game that has already flapped once"""
+    game.state = game_module.PLAYING
+    game.replay = None
+    game.seed = BENCH_SEED
+    game.reset()
+    game.flap_pending = True
+
+
+def autopilot(game):
+    """Keep the game alive with the scripted gap follower, restarting on a crash"""
+    if game.game_over:
+        start_run(game)
+    else:
+        game.flap_pending = flappy_core.gap_follower(game.sim)
+
+
+def crash_into_pipe(game):
+    """Play untimed until the airplane overlaps a pipe, then fly it into the top pipe"""
+    start_run(game)
+    airplane = game.airplane
+    while not game.game_over:
+        pipe = game.sim.next_pipe()
+        if pipe is not None and pipe.x < airplane.x + airplane.width // 2 < pipe.x + pipe.width:
+            airplane.y = pipe.height - airplane.height
+            airplane.velocity = 0
+        else:
+            game.flap_pending = flappy_core.gap_follower(game.sim)
+        game.update()
+    game.crash_frame = game.sim.frame
+
+
+def scenario_day(game):
+    start_run(game)
+
+    def before_frame():
+        autopilot(game)
+        game.game_time = 0
+    return before_frame
+
+
+def scenario_night(game):
+    start_run(game)
+
+    def before_frame():
+        autopilot(game)
+        game.game_time = game.cycle_duration // 2  # Stars and moon at full opacity
+    return before_frame
+
+
+def scenario_crash(game):
+    crash_into_pipe(game)
+
+    def before_frame():
+        if game.sim.frame - game.crash_frame >= CRASH_FRAMES:
+            crash_into_pipe(game)
+    return before_frame
+
+
+def scenario_many_pipes(game):
+    # The spawn curve only reaches MIN_SPAWN_TIME at high scores, when pipes are
+    # fast and sparse; forcing it at the slow starting speed packs the screen.
+    # Spawns follow the tick counter, and every run is played untimed until
+    # the screen has filled up, so the timed frames all see a full screen.
+    spawn_ticks = MIN_SPAWN_TIME * TICK_RATE // 1000
+    fill_ticks = (SCREEN_WIDTH + PIPE_WIDTH) // INITIAL_PIPE_VELOCITY  # First pipe crosses the screen
+
+    def step():
+        sim = game.sim
+        if sim.started and sim.tick % spawn_ticks == 0:
+            sim.last_spawn_tick = -sys.maxsize  # Spawn on this tick
+        game.flap_pending = flappy_core.gap_follower(sim)
+
+    def fill_screen():
+        start_run(game)
+        while game.sim.tick < fill_ticks and not game.game_over:
+            step()
+            game.update()
+
+    fill_screen()
+
+    def before_frame():
+        if game.game_over:
+            fill_screen()
+        step()
+    return before_frame
+
+
+def scenario_particles(game):
+    start_run(game)
+
+    def before_frame():
+        autopilot(game)
+        game.create_explosion(game_module.SCREEN_WIDTH // 2, game_module.SCREEN_HEIGHT // 2, PARTICLE_BURST)
+    return before_frame
+
+
+SCENARIOS = {
+    "day": scenario_day,
+    "night": scenario_night,
+    "crash": scenario_crash,
+    "many_pipes": scenario_many_pipes,
+    "particles": scenario_particles,
+}
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def parse_resolution(text):
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+
+def run_scenario(game, name, frames, present=False):
+    """Time update + draw (+ present) for one scenario; returns stats in milliseconds"""
+    before_frame = SCENARIOS[name](game)
+    samples = []
+    pipes = particles = 0
+    allocated = None
+    for i in range(WARMUP_FRAMES + frames):
+        if i == WARMUP_FRAMES:
+            allocated = game.allocated_entities()
+        before_frame()
+        start = time.perf_counter()
+        game.update()
+        game.draw_screen()
+        if present:
+            game.viewport.present()
+        elapsed = time.perf_counter() - start
+        pygame.event.pump()
+        if i >= WARMUP_FRAMES:
+            samples.append(elapsed * 1000)
+            pipes += len(game.pipes)
+            particles += len(game.particles)
+    samples.sort()
+    return {
+        "mean_ms": sum(samples) / len(samples),
+        "p95_ms": percentile(samples, 0.95),
+        "p99_ms": percentile(samples, 0.99),
+        "frames": frames,
+        "avg_pipes": pipes / frames,
+        "avg_particles": particles / frames,
+        "new_objects": game.allocated_entities() - allocated,  # Pipes/particles built after warm-up
+    }
+
+
+def run_benchmarks(names, frames, modes=("rect",), resolutions=(None,)):
+    game = game_module.Game()
+    game.audio_ready.wait()
+    game.install_audio()  # Time frames with the real sounds, as in play
+    game.high_score = sys.maxsize  # Never write highscore files from a benchmark
+    game.record_path = None
+    results = {}
+    for resolution in resolutions:
+        if resolution is not None:
+            game.viewport.open(resolution)
+        for name in names:
+            for mode in modes:
+                game.precise_collision = mode == "precise"
+                key = name if mode == "rect" else f"{name}+{mode}"
+                if resolution is not None:
+                    key += "@{}x{}".format(*resolution)
+                results[key] = run_scenario(game, name, frames, present=resolution is not None)
+                stats = results[key]
+                print(f"[INFO] {key:<22} mean {stats['mean_ms']:6.3f} ms  p95 {stats['p95_ms']:6.3f} ms  "
+                      f"p99 {stats['p99_ms']:6.3f} ms  ({stats['avg_pipes']:.1f} pipes, "
+                      f"{stats['avg_particles']:.0f} particles, {stats['new_objects']} new objects)")
+    if len(modes) > 1 and None in resolutions:
+        for name in names:
+            rect, precise = results[name], results[f"{name}+precise"]
+            print(f"[INFO] {name:<11} precise vs rect: mean {precise['mean_ms'] / rect['mean_ms'] - 1:+.1%}  "
+                  f"p99 {precise['p99_ms'] / rect['p99_ms'] - 1:+.1%}")
+        print(f"[INFO] Mask cache: {game_module.mask_cache.stats()}")
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Print regressions against a baseline; returns the number found"""
+    regressions = 0
+    for name, stats in results.items():
+        old = baseline.get("scenarios", {}).get(name)
+        if old is None:
+            print(f"[INFO] {name}: no baseline")
+            continue
+        for metric in ("mean_ms", "p95_ms", "p99_ms"):
+            change = stats[metric] / old[metric] - 1 if old[metric] > 0 else 0
+            if change > threshold:
+                regressions += 1
+                print(f"[WARNING] Regression in {name} {metric}: {old[metric]:.3f} -> {stats[metric]:.3f} ms "
+                      f"(+{change:.0%})")
+    if regressions == 0:
+        print(f"[OK] No regressions past {threshold:.0%}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Flappy Osama frame-time benchmarks")
+    parser.add_argument("--frames", type=int, default=600, help="timed frames per scenario (default 600)")
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS),
+                        help="run only this scenario (repeatable)")
+    parser.add_argument("--save", metavar="FILE", help="write the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="FILE", help="compare against a JSON baseline")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="relative slowdown counted as a regression (default 0.10)")
+    parser.add_argument("--collision", choices=["rect", "precise", "both"], default="rect",
+                        help="collision mode to time (default rect)")
+    parser.add_argument("--resolution", action="append", type=parse_resolution, metavar="WxH",
+                        help="also time each scenario rendered and presented at a WxH window, "
+                             "after the native runs, e.g. 1080x1920 (repeatable)")
+    args = parser.parse_args()
+
+    modes = ("rect", "precise") if args.collision == "both" else (args.collision,)
+    results = run_benchmarks(args.scenario or list(SCENARIOS), args.frames, modes,
+                             (None, *(args.resolution or ())))
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({
+                "python": platform.python_version(),
+                "pygame": pygame.version.ver,
+                "machine": platform.machine(),
+                "scenarios": results,
+            }, f, indent=2)
+        print(f"[OK] Saved baseline to {args.save}")
+
+    regressions = 0
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+    pygame.quit()
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
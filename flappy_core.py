@@ -0,0 +1,883 @@
+"""Display-free game rules for Flappy Osama.
+
+Everything here runs without pygame: no window, no audio and no wall
+clock. Time advances in fixed ticks of 1/TICK_RATE seconds, so the same
+inputs and RNG seed always produce the same game. flappy_airplane.py
+subclasses the bodies to draw them; bots, balance tests and replay
+verification can drive Simulation directly.
+"""
+import copy
+import hashlib
+import json
+import random
+import struct
+import sys
+import time
+from collections import deque
+
+# Constants
+SCREEN_WIDTH = 600
+SCREEN_HEIGHT = 800
+TICK_RATE = 60  # Simulation ticks per second
+
+# Game variables
+GRAVITY = 0.5
+FLAP_STRENGTH = -7  # Reduced from -10 for better control
+INITIAL_PIPE_GAP = 320  # Starting gap size - Very easy at start
+MIN_PIPE_GAP = 200  # Minimum gap at high scores - Still playable
+PIPE_WIDTH = 70
+INITIAL_PIPE_VELOCITY = 2  # Slower initial speed
+MAX_PIPE_VELOCITY = 8  # Maximum speed at high scores
+INITIAL_SPAWN_TIME = 1800  # Starting spawn time
+MIN_SPAWN_TIME = 1000  # Minimum spawn time at high scores
+
+# Events reported by Simulation.step (bit flags)
+SCORED = 1
+CRASHED = 2
+
+# Replay file format: header, then flap frames as varint deltas
+REPLAY_MAGIC = b"FLRP"
+REPLAY_VERSION = 3
+# magic, version, seed, rules, frames, score, flaps, difficulty fingerprint, precise collision
+REPLAY_HEADER = struct.Struct("<4sBQddiiiddiiIIIQ?")
+MAX_SEED = 2 ** 64 - 1  # Seeds are stored unsigned in 64 bits
+
+# Lookahead autopilot (see LookaheadPilot)
+PILOT_HORIZON = 60  # Ticks a flight plan must survive
+PILOT_DECISION_TICKS = 4  # Ticks between flap decisions within a plan
+PILOT_MAX_ROLLOUTS = 400  # Plan segments simulated per call at most
+
+# Causes of death
+DEATH_CEILING = "ceiling"
+DEATH_GROUND = "ground"
+DEATH_PIPE = "pipe"
+
+
+class Rules:
+    """Tunable game rules; the defaults are the module constants"""
+    def __init__(self, gravity=GRAVITY, flap_strength=FLAP_STRENGTH,
+                 initial_gap=INITIAL_PIPE_GAP, min_gap=MIN_PIPE_GAP, pipe_width=PIPE_WIDTH,
+                 initial_velocity=INITIAL_PIPE_VELOCITY, max_velocity=MAX_PIPE_VELOCITY,
+                 initial_spawn_time=INITIAL_SPAWN_TIME, min_spawn_time=MIN_SPAWN_TIME):
+        self.gravity = gravity
+        self.flap_strength = flap_strength
+        self.initial_gap = initial_gap
+        self.min_gap = min_gap
+        self.pipe_width = pipe_width
+        self.initial_velocity = initial_velocity
+        self.max_velocity = max_velocity
+        self.initial_spawn_time = initial_spawn_time
+        self.min_spawn_time = min_spawn_time
+
+
+def new_seed():
+    """Fresh random seed for a run"""
+    return random.SystemRandom().getrandbits(63)
+
+
+def rules_to_tuple(rules):
+    return (rules.gravity, rules.flap_strength, rules.initial_gap, rules.min_gap, rules.pipe_width,
+            rules.initial_velocity, rules.max_velocity, rules.initial_spawn_time, rules.min_spawn_time)
+
+
+# Difficulty curves, overridable with a JSON file (see Difficulty). Each curve
+# has "steps" of [below, value] pairs (value applies while score < below) and a
+# "tail" for higher scores: base + (score - start) // every * step, clamped at
+# "limit" (a number or a Rules attribute name).
+DEFAULT_DIFFICULTY = {
+    # Level 1-2 (0-5): 2.0, Level 3: 3.5, Level 4: 4.5, Level 5: 5.5,
+    # Level 6-7: 6.5, Level 8+ (30+): 7.0 and up, gradually
+    "velocity": {
+        "steps": [[6, 2.0], [10, 3.5], [15, 4.5], [20, 5.5], [30, 6.5]],
+        "tail": {"start": 30, "base": 7.0, "step": 0.05, "every": 1, "limit": "max_velocity"},
+    },
+    # Level 1-2: Very Easy 320px, Level 3: Easy 300px, Level 4: Medium 280px,
+    # Level 5: Hard 260px, Level 6-7: Very Hard 240px, Level 8+: Expert 230px down
+    "gap": {
+        "steps": [[6, 320], [10, 300], [15, 280], [20, 260], [30, 240]],
+        "tail": {"start": 30, "base": 230, "step": -5, "every": 5, "limit": "min_gap"},
+    },
+    # Level 1-2: 1800ms, Level 3: 1650ms, Level 4: 1500ms, Level 5: 1350ms,
+    # Level 6-7: 1200ms, Level 8+: 1150ms down
+    "spawn_time": {
+        "steps": [[6, 1800], [10, 1650], [15, 1500], [20, 1350], [30, 1200]],
+        "tail": {"start": 30, "base": 1150, "step": -20, "every": 5, "limit": "min_spawn_time"},
+    },
+    # HUD level number and name
+    "level": {
+        "steps": [[3, [1, "Beginner"]], [6, [2, "Novice"]], [10, [3, "Apprentice"]], [15, [4, "Skilled"]],
+                  [20, [5, "Advanced"]], [25, [6, "Expert"]], [30, [7, "Master"]], [35, [8, "Elite"]],
+                  [40, [9, "Champion"]], [50, [10, "Legend"]], [60, [11, "Mythic"]], [75, [12, "Godlike"]],
+                  [100, [13, "Immortal"]]],
+        "tail": {"start": 100, "base": 14, "step": 1, "every": 20, "name": "Transcendent"},
+    },
+}
+DIFFICULTY_CURVES = ("velocity", "gap", "spawn_time", "level")
+DIFFICULTY_TABLE_SIZE = 1000  # Scores with precomputed values; higher scores evaluate the tail
+
+
+class Difficulty:
+    """Difficulty curves compiled into lookup tables indexed by score.
+
+    config is a dict like DEFAULT_DIFFICULTY (None for the defaults);
+    invalid configs raise ValueError. Limits that name a Rules attribute
+    are resolved against rules, so modded rules get their own tables.
+    """
+    def __init__(self, config=None, rules=None, table_size=DIFFICULTY_TABLE_SIZE):
+        self.config = config if config is not None else DEFAULT_DIFFICULTY
+        self.rules = rules if rules is not None else Rules()
+        validate_difficulty(self.config)
+        self.curves = {name: self.resolve(self.config[name]) for name in DIFFICULTY_CURVES}
+        self.tables = {name: [self.evaluate(name, score) for score in range(table_size)]
+                       for name in DIFFICULTY_CURVES}
+        self._fingerprint = None
+
+    def fingerprint(self):
+        """64-bit hash of the compiled curves; equal for curves that play the same"""
+        if self._fingerprint is None:
+            # Numbers as floats: rules loaded from a replay header are floats where the defaults are ints
+            canonical = repr(as_floats((self.curves, self.tables)))
+            digest = hashlib.sha256(canonical.encode()).digest()
+            self._fingerprint = int.from_bytes(digest[:8], "little")
+        return self._fingerprint
+
+    def resolve(self, curve):
+        """Steps and tail with the limit looked up in the rules"""
+        tail = dict(curve["tail"])
+        if isinstance(tail.get("limit"), str):
+            tail["limit"] = getattr(self.rules, tail["limit"])
+            if tail["limit"] <= 0:
+                raise ValueError(f"rule '{curve['tail']['limit']}' used as a limit must be positive")
+        return [tuple(step) for step in curve["steps"]], tail
+
+    def evaluate(self, name, score):
+        steps, tail = self.curves[name]
+        for below, value in steps:
+            if score < below:
+                return tuple(value) if name == "level" else value
+        value = tail["base"] + (score - tail["start"]) // tail["every"] * tail["step"]
+        if name == "level":
+            return (value, tail["name"])
+        limit = tail.get("limit")
+        if limit is not None:
+            value = min(value, limit) if tail["step"] > 0 else max(value, limit)
+        return value
+
+    def lookup(self, name, score):
+        table = self.tables[name]
+        return table[score] if score < len(table) else self.evaluate(name, score)
+
+    def velocity(self, score):
+        return self.lookup("velocity", score)
+
+    def gap(self, score):
+        return self.lookup("gap", score)
+
+    def spawn_time(self, score):
+        return self.lookup("spawn_time", score)
+
+    def level(self, score):
+        """(level number, level name) shown on the HUD"""
+        return self.lookup("level", score)
+
+
+def as_floats(value):
+    """Copy of nested lists, tuples and dicts with every number as a float"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, dict):
+        return {key: as_floats(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return tuple(as_floats(item) for item in value)
+    return value
+
+
+def validate_difficulty(config):
+    """Raise ValueError describing the first problem in a difficulty config"""
+    if not isinstance(config, dict):
+        raise ValueError("difficulty config must be an object")
+    for name in DIFFICULTY_CURVES:
+        curve = config.get(name)
+        if not isinstance(curve, dict) or "steps" not in curve or "tail" not in curve:
+            raise ValueError(f"curve '{name}' needs 'steps' and 'tail'")
+        previous = 0
+        for step in curve["steps"]:
+            if not isinstance(step, (list, tuple)) or len(step) != 2:
+                raise ValueError(f"curve '{name}': steps must be [below, value] pairs")
+            below, value = step
+            if not isinstance(below, int) or below <= previous:
+                raise ValueError(f"curve '{name}': step bounds must be increasing positive integers")
+            if name == "level":
+                if (not isinstance(value, (list, tuple)) or len(value) != 2 or not isinstance(value[0], int)
+                        or not isinstance(value[1], str)):
+                    raise ValueError("curve 'level': values must be [number, name]")
+            elif not isinstance(value, (int, float)) or value <= 0:
+                raise ValueError(f"curve '{name}': values must be positive numbers")
+            previous = below
+        tail = curve["tail"]
+        if not isinstance(tail, dict):
+            raise ValueError(f"curve '{name}': tail must be an object")
+        for key in ("start", "base", "step", "every"):
+            if not isinstance(tail.get(key), (int, float)):
+                raise ValueError(f"curve '{name}': tail needs a numeric '{key}'")
+        if tail["start"] != previous:
+            raise ValueError(f"curve '{name}': tail must start where the last step ends ({previous})")
+        if not isinstance(tail["every"], int) or tail["every"] < 1:
+            raise ValueError(f"curve '{name}': tail 'every' must be a positive integer")
+        if name == "level":
+            if not isinstance(tail.get("name"), str):
+                raise ValueError("curve 'level': tail needs a 'name'")
+            continue
+        if tail["base"] <= 0:
+            raise ValueError(f"curve '{name}': tail 'base' must be a positive number")
+        limit = tail.get("limit")
+        if limit is None and tail["step"] != 0:
+            raise ValueError(f"curve '{name}': a changing tail needs a 'limit'")
+        if isinstance(limit, str) and not hasattr(Rules(), limit):
+            raise ValueError(f"curve '{name}': unknown rule '{limit}' as limit")
+        if limit is not None and not isinstance(limit, (int, float, str)):
+            raise ValueError(f"curve '{name}': limit must be a number or a rule name")
+        if isinstance(limit, (int, float)) and limit <= 0:
+            raise ValueError(f"curve '{name}': limit must be a positive number")
+
+
+def load_difficulty(path):
+    """Read and validate a difficulty config from a JSON file"""
+    with open(path) as f:
+        config = json.load(f)
+    validate_difficulty(config)
+    return config
+
+
+_default_difficulty = {}
+
+
+def default_difficulty(rules):
+    """Shared Difficulty with the default curves for these rules"""
+    key = rules_to_tuple(rules)
+    difficulty = _default_difficulty.get(key)
+    if difficulty is None:
+        difficulty = _default_difficulty[key] = Difficulty(rules=rules)
+    return difficulty
+
+
+def get_pipe_velocity(score, rules):
+    """Calculate pipe velocity based on score for progressive difficulty"""
+    return default_difficulty(rules).velocity(score)
+
+
+def get_pipe_gap(score, rules):
+    """Calculate pipe gap based on score - gets smaller as score increases"""
+    return default_difficulty(rules).gap(score)
+
+
+def get_spawn_time(score, rules):
+    """Calculate spawn time based on score - pipes spawn faster at higher scores"""
+    return default_difficulty(rules).spawn_time(score)
+
+
+class AirplaneBody:
+    """Airplane position and physics"""
+    __slots__ = ("x", "y", "velocity", "width", "height", "angle")
+
+    def __init__(self):
+        self.x = 100
+        self.y = SCREEN_HEIGHT // 2
+        self.velocity = 0
+        self.width = 40  # Reduced for better collision
+        self.height = 24  # Reduced for better collision
+        self.angle = 0
+
+    def flap(self, strength=FLAP_STRENGTH):
+        self.velocity = strength
+
+    def update(self, gravity=GRAVITY):
+        self.velocity += gravity
+        self.y += self.velocity
+
+        # Update angle based on velocity
+        if self.velocity < 0:
+            self.angle = min(25, -self.velocity * 3)
+        else:
+            self.angle = max(-90, -self.velocity * 2)
+
+    def get_state(self):
+        return (self.x, self.y, self.velocity, self.angle)
+
+    def set_state(self, state):
+        self.x, self.y, self.velocity, self.angle = state
+
+    def get_bounds(self):
+        """Collision box as (left, top, right, bottom), truncated like pygame.Rect"""
+        left = int(self.x - self.width // 2)
+        top = int(self.y - self.height // 2)
+        return left, top, left + self.width, top + self.height
+
+    def is_off_screen(self):
+        return self.y < 0 or self.y > SCREEN_HEIGHT
+
+
+class PipeBody:
+    """A top/bottom pipe pair and its falling animation state"""
+    __slots__ = ("x", "velocity", "gap_size", "width", "height", "passed", "falling",
+                 "fall_rotation", "fall_direction", "fall_speed", "fall_y_offset")
+
+    def __init__(self, x, velocity=INITIAL_PIPE_VELOCITY, gap_size=INITIAL_PIPE_GAP,
+                 width=PIPE_WIDTH, rng=random):
+        self.x = x
+        self.velocity = velocity
+        self.gap_size = gap_size
+        self.width = width
+        # Ensure pipe gap is always in a playable position
+        # Minimum 100px from top, maximum leaves 100px at bottom
+        min_height = 100
+        max_height = SCREEN_HEIGHT - gap_size - 100
+        # Ensure max_height is always greater than min_height
+        if max_height <= min_height:
+            max_height = min_height + 50
+        self.height = rng.randint(min_height, max_height)
+        self.passed = False
+
+        # Falling animation properties
+        self.falling = False
+        self.fall_rotation = 0
+        self.fall_direction = rng.choice([-1, 1])  # -1 for left, 1 for right
+        self.fall_speed = 0
+        self.fall_y_offset = 0
+
+    def update(self):
+        if not self.falling:
+            self.x -= self.velocity
+        else:
+            # Falling animation
+            self.fall_rotation += 3 * self.fall_direction  # Rotate
+            self.fall_speed += 0.5  # Gravity
+            self.fall_y_offset += self.fall_speed  # Fall down
+            self.x += self.fall_direction * 2  # Move sideways
+
+    def is_off_screen(self):
+        return self.x < -self.width
+
+    def get_state(self):
+        return (self.x, self.velocity, self.gap_size, self.width, self.height, self.passed, self.falling,
+                self.fall_rotation, self.fall_direction, self.fall_speed, self.fall_y_offset)
+
+    def set_state(self, state):
+        (self.x, self.velocity, self.gap_size, self.width, self.height, self.passed, self.falling,
+         self.fall_rotation, self.fall_direction, self.fall_speed, self.fall_y_offset) = state
+
+    def start_falling(self):
+        """Start the falling animation"""
+        self.falling = True
+
+    def collides_with(self, airplane):
+        if self.falling:  # Don't check collision if already falling
+            return False
+        left, top, right, bottom = airplane.get_bounds()
+        x = int(self.x)
+        if right <= x or left >= x + self.width:
+            return False
+        # Top pipe spans (0, height), bottom pipe spans (height + gap, SCREEN_HEIGHT)
+        bottom_y = self.height + self.gap_size
+        return ((top < self.height and bottom > 0) or
+                (top < SCREEN_HEIGHT and bottom > bottom_y and bottom_y < SCREEN_HEIGHT))
+
+
+class ObjectPool:
+    """Recycles released objects of one class instead of allocating new ones.
+
+    acquire(*args) re-runs __init__ on a released object, or builds one
+    when the pool is empty, so a recycled object starts exactly like a
+    fresh one. allocated counts objects ever built; live counts objects
+    acquired and not yet released.
+    """
+    def __init__(self, cls):
+        self.cls = cls
+        self.free = []
+        self.allocated = 0
+        self.live = 0
+
+    def acquire(self, *args):
+        free = self.free
+        if free:
+            obj = free.pop()
+        else:
+            obj = self.cls.__new__(self.cls)
+            self.allocated += 1
+        obj.__init__(*args)
+        self.live += 1
+        return obj
+
+    def release(self, obj):
+        self.live -= 1
+        self.free.append(obj)
+
+    def reserve(self, count):
+        """Build objects up front until count are free, so play starts allocation-free"""
+        while len(self.free) < count:
+            self.free.append(self.cls.__new__(self.cls))
+            self.allocated += 1
+
+    def stats(self):
+        return {"live": self.live, "pooled": len(self.free), "allocated": self.allocated}
+
+
+class Simulation:
+    """One game of Flappy Osama advanced in fixed ticks.
+
+    step(action) applies an optional flap and advances one tick, returning
+    SCORED/CRASHED event flags. Pipes keep moving (and falling) after the
+    crash so a renderer can finish the animation.
+
+    narrow_phase, if given, is called as narrow_phase(pipe, airplane) once
+    the collision boxes overlap and can veto the crash (e.g. a pixel test).
+    A run only replays exactly with the same narrow phase.
+
+    pipe_release, if given, is called with every pipe the simulation drops
+    (e.g. ObjectPool.release when pipe_factory is ObjectPool.acquire).
+
+    snapshot() and restore() save and rewind the whole game state for
+    lookahead search. The rng must only be used by the simulation, which
+    draws from it only when a pipe spawns.
+    """
+    def __init__(self, rules=None, rng=None, airplane=None, pipe_factory=PipeBody, recording=None,
+                 difficulty=None, narrow_phase=None, pipe_release=None):
+        self.rules = rules if rules is not None else Rules()
+        self.difficulty = difficulty if difficulty is not None else default_difficulty(self.rules)
+        self.recording = recording  # Flap inputs are logged here when set
+        if recording is not None:
+            recording.difficulty = self.difficulty.fingerprint()
+        self.rng = rng if rng is not None else random.Random()
+        self.pipe_factory = pipe_factory
+        self.pipe_release = pipe_release
+        self.narrow_phase = narrow_phase
+        self.airplane = airplane if airplane is not None else AirplaneBody()
+        self.pipes = deque()  # Sorted by x, leftmost first
+        self.score = 0
+        self.started = False
+        self.over = False
+        self.frame = 0  # step() calls, including before the first flap
+        self.tick = 0  # Ticks of play since the first flap
+        self.last_spawn_tick = None
+        self.current_velocity = self.rules.initial_velocity
+        self.current_gap = self.rules.initial_gap
+        self.current_spawn_time = self.difficulty.spawn_time(0)
+        self.death_cause = None
+        self.crash_pipe = None
+        self.rng_state = None  # Cached rng.getstate() while the rng is unchanged (see snapshot)
+
+    def flap(self):
+        if not self.over:
+            self.airplane.flap(self.rules.flap_strength)
+            self.started = True
+
+    def step(self, action=False):
+        """Advance one tick, flapping first if action is true"""
+        self.frame += 1
+        if action and not self.over:
+            self.flap()
+            if self.recording is not None:
+                self.recording.flaps.append(self.frame)
+
+        # Pipes keep moving after game over (for the falling animation)
+        pipes = self.pipes
+        in_order = True
+        previous_x = None
+        for pipe in pipes:
+            pipe.update()
+            if previous_x is not None and pipe.x < previous_x:
+                in_order = False
+            previous_x = pipe.x
+        if not in_order:
+            self.reorder_pipes()
+
+        if not self.started or self.over:
+            return 0
+
+        events = 0
+        self.tick += 1
+        airplane = self.airplane
+        airplane.update(self.rules.gravity)
+
+        # Check if airplane hits ground or ceiling
+        if airplane.is_off_screen():
+            self.over = True
+            self.death_cause = DEATH_CEILING if airplane.y < 0 else DEATH_GROUND
+            events |= CRASHED
+
+        # Check collisions and scoring only for pipes left of the airplane's
+        # right edge: the ones further right can neither hit it nor be passed
+        right = airplane.get_bounds()[2]
+        narrow_phase = self.narrow_phase
+        for pipe in pipes:
+            if pipe.x >= right:
+                break
+            if (not self.over and pipe.collides_with(airplane) and
+                    (narrow_phase is None or narrow_phase(pipe, airplane))):
+                self.over = True
+                self.death_cause = DEATH_PIPE
+                self.crash_pipe = pipe
+                pipe.start_falling()
+                events |= CRASHED
+
+            # Check if passed pipe
+            if not pipe.passed and pipe.x + pipe.width < airplane.x:
+                pipe.passed = True
+                self.score += 1
+                events |= SCORED
+
+        # Remove off-screen pipes (always at the front)
+        while pipes and pipes[0].is_off_screen():
+            self.drop_pipe(pipes.popleft())
+
+        # Spawn new pipes with current difficulty
+        if events & SCORED:
+            self.current_spawn_time = self.difficulty.spawn_time(self.score)
+        if (self.last_spawn_tick is None or
+                (self.tick - self.last_spawn_tick) * 1000 > self.current_spawn_time * TICK_RATE):
+            self.current_velocity = self.difficulty.velocity(self.score)
+            self.current_gap = self.difficulty.gap(self.score)
+            # Every other pipe has moved left of SCREEN_WIDTH, so this keeps the x order
+            pipes.append(self.pipe_factory(SCREEN_WIDTH, self.current_velocity, self.current_gap,
+                                           self.rules.pipe_width, self.rng))
+            self.rng_state = None
+            self.last_spawn_tick = self.tick
+
+        if events & CRASHED and self.recording is not None:
+            self.recording.frames = self.frame
+            self.recording.score = self.score
+        return events
+
+    def snapshot(self):
+        """The game state as plain numbers and tuples (never pipe or airplane objects).
+
+        Pass the result to restore() to rewind this or another Simulation
+        with the same rules. Snapshots taken between pipe spawns share one
+        copy of the rng state, so taking one costs about as much as a step.
+        """
+        pipes = self.pipes
+        crash_index = None
+        if self.crash_pipe is not None and self.crash_pipe in pipes:
+            crash_index = pipes.index(self.crash_pipe)
+        if self.rng_state is None:
+            self.rng_state = self.rng.getstate()
+        return (self.frame, self.tick, self.score, self.started, self.over, self.last_spawn_tick,
+                self.current_velocity, self.current_gap, self.current_spawn_time, self.death_cause,
+                crash_index, self.rng_state, self.airplane.get_state(),
+                tuple([pipe.get_state() for pipe in pipes]),
+                len(self.recording.flaps) if self.recording is not None else 0)
+
+    def restore(self, state):
+        """Rewind to a snapshot, reusing the existing pipe objects where possible.
+
+        Only rules state is restored; render-only fields of the game's Pipe
+        and Airplane subclasses (interpolation, pre-rendered frames) are not.
+        """
+        (self.frame, self.tick, self.score, self.started, self.over, self.last_spawn_tick,
+         self.current_velocity, self.current_gap, self.current_spawn_time, self.death_cause,
+         crash_index, rng_state, airplane_state, pipe_states, flap_count) = state
+        self.airplane.set_state(airplane_state)
+        pipes = self.pipes
+        while len(pipes) > len(pipe_states):
+            self.drop_pipe(pipes.pop())
+        while len(pipes) < len(pipe_states):
+            # New pipes draw from the rng, which is reset below
+            pipes.append(self.pipe_factory(SCREEN_WIDTH, self.current_velocity, self.current_gap,
+                                           self.rules.pipe_width, self.rng))
+            self.rng_state = None
+        for pipe, pipe_state in zip(pipes, pipe_states):
+            pipe.set_state(pipe_state)
+        self.crash_pipe = pipes[crash_index] if crash_index is not None else None
+        if rng_state is not self.rng_state:
+            self.rng.setstate(rng_state)
+            self.rng_state = rng_state
+        if self.recording is not None:
+            del self.recording.flaps[flap_count:]
+
+    def drop_pipe(self, pipe):
+        if pipe is self.crash_pipe:
+            self.crash_pipe = None  # The object may be recycled as a new pipe
+        if self.pipe_release is not None:
+            self.pipe_release(pipe)
+
+    def clear_pipes(self):
+        """Drop every pipe, e.g. before the simulation is discarded"""
+        while self.pipes:
+            self.drop_pipe(self.pipes.pop())
+
+    def reorder_pipes(self):
+        """Restore x order with adjacent swaps after a faster pipe overtook a slower one"""
+        pipes = self.pipes
+        for i in range(1, len(pipes)):
+            j = i
+            while j > 0 and pipes[j].x < pipes[j - 1].x:
+                pipes[j], pipes[j - 1] = pipes[j - 1], pipes[j]
+                j -= 1
+
+    def next_pipe(self):
+        """The nearest pipe the airplane has not passed yet, or None"""
+        for pipe in self.pipes:
+            if not pipe.passed and not pipe.falling:
+                return pipe
+        return None
+
+    def observe(self):
+        """(y, velocity, distance to next pipe, gap top, gap bottom) for bots"""
+        airplane = self.airplane
+        pipe = self.next_pipe()
+        if pipe is None:
+            return (airplane.y, airplane.velocity, float(SCREEN_WIDTH), 0.0, float(SCREEN_HEIGHT))
+        return (airplane.y, airplane.velocity, pipe.x - airplane.x,
+                float(pipe.height), float(pipe.height + pipe.gap_size))
+
+
+class Recording:
+    """Seed, rules and flap inputs of one run: enough to replay it exactly.
+
+    flaps holds the Simulation.frame numbers on which a flap was applied;
+    frames and score are filled in when the run crashes. difficulty is the
+    Difficulty.fingerprint() of the curves the run was played with, and
+    precise_collision is set for runs whose pipe hits were confirmed with
+    the game's sprite masks (which replay() cannot reproduce).
+    """
+    def __init__(self, seed, rules, flaps=None, frames=0, score=0, difficulty=0, precise_collision=False):
+        self.seed = seed
+        self.rules = rules
+        self.flaps = flaps if flaps is not None else []
+        self.frames = frames
+        self.score = score
+        self.difficulty = difficulty
+        self.precise_collision = precise_collision
+
+    def check_difficulty(self, difficulty):
+        """Raise ValueError unless the run was recorded with these difficulty curves"""
+        if difficulty.fingerprint() != self.difficulty:
+            raise ValueError("the replay was recorded with different difficulty curves; "
+                             "restore the difficulty.json it was played with")
+
+    def save(self, path):
+        """Write the compact binary form (a few bytes per flap)"""
+        data = bytearray(REPLAY_HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, self.seed,
+                                            *rules_to_tuple(self.rules),
+                                            self.frames, self.score, len(self.flaps),
+                                            self.difficulty, self.precise_collision))
+        previous = 0
+        for frame in self.flaps:
+            delta = frame - previous
+            previous = frame
+            # Unsigned LEB128 varint
+            while delta >= 0x80:
+                data.append((delta & 0x7F) | 0x80)
+                delta >>= 7
+            data.append(delta)
+        with open(path, 'wb') as f:
+            f.write(data)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        if len(data) < REPLAY_HEADER.size:
+            raise ValueError(f"{path} is not a replay file")
+        fields = REPLAY_HEADER.unpack_from(data)
+        magic, version, seed = fields[:3]
+        if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+            raise ValueError(f"{path} is not a version {REPLAY_VERSION} replay file")
+        rules = Rules(*fields[3:12])
+        frames, score, count, difficulty, precise_collision = fields[12:]
+
+        flaps = []
+        frame = 0
+        pos = REPLAY_HEADER.size
+        for _ in range(count):
+            delta = shift = 0
+            while True:
+                byte = data[pos]
+                pos += 1
+                delta |= (byte & 0x7F) << shift
+                shift += 7
+                if byte < 0x80:
+                    break
+            frame += delta
+            flaps.append(frame)
+        return cls(seed, rules, flaps, frames, score, difficulty, precise_collision)
+
+
+def replay(recording, difficulty_config=None):
+    """Re-run a recording headless as fast as possible; returns the finished Simulation.
+
+    Raises ValueError if difficulty_config is not the one the run was recorded
+    with, or if the run used precise collision.
+    """
+    if recording.precise_collision:
+        raise ValueError("the run was played with precise collision, which needs the game's sprite masks")
+    if difficulty_config is not None:
+        difficulty = Difficulty(difficulty_config, recording.rules)
+    else:
+        difficulty = default_difficulty(recording.rules)
+    recording.check_difficulty(difficulty)
+    sim = Simulation(recording.rules, rng=random.Random(recording.seed), difficulty=difficulty)
+    flaps = set(recording.flaps)
+    while not sim.over and sim.frame < recording.frames:
+        sim.step(sim.frame + 1 in flaps)
+    return sim
+
+
+def verify(recording, difficulty_config=None):
+    """True if replaying the recording reproduces its score and crash frame"""
+    sim = replay(recording, difficulty_config)
+    return sim.over and sim.score == recording.score and sim.frame == recording.frames
+
+
+def gap_follower(sim):
+    """Simple scripted policy: flap when falling below the middle of the next gap"""
+    if not sim.started:
+        return True
+    y, velocity, _, gap_top, gap_bottom = sim.observe()
+    return velocity > 0 and y > gap_top + (gap_bottom - gap_top) * 0.6
+
+
+class LookaheadPilot:
+    """Search-based autopilot, called like a policy: pilot(sim) -> bool.
+
+    On every decision_ticks-th tick it copies the game into a private
+    scratch Simulation with snapshot()/restore() and searches depth first
+    over flap/no-flap decisions on the same tick grid, trying the gap
+    follower's choice first; between decisions it never flaps. It returns
+    the first action of the first plan that survives horizon ticks, or of
+    the longest-surviving plan once max_rollouts segments have been
+    simulated. The scratch game sees the same seeded
+    pipes as the real one, so plans are exact.
+    """
+    def __init__(self, horizon=PILOT_HORIZON, decision_ticks=PILOT_DECISION_TICKS,
+                 max_rollouts=PILOT_MAX_ROLLOUTS):
+        self.horizon = horizon
+        self.decision_ticks = decision_ticks
+        self.max_rollouts = max_rollouts
+        self.scratch = None
+        self.budget = 0
+        self.rollouts = 0  # Segments simulated over all calls
+
+    def __call__(self, sim):
+        if not sim.started:
+            return True
+        if sim.over or sim.tick % self.decision_ticks:
+            # Flap only on the decision grid, so the plan found last time is still a candidate
+            return False
+        scratch = self.scratch_for(sim)
+        root = sim.snapshot()
+        self.budget = self.max_rollouts
+        first = gap_follower(sim)
+        best_action, best_ticks = first, -1
+        for action in (first, not first):
+            scratch.restore(root)
+            ticks = self.search(scratch, action, self.horizon)
+            if ticks >= self.horizon:
+                return action
+            if ticks > best_ticks:
+                best_action, best_ticks = action, ticks
+        return best_action
+
+    def scratch_for(self, sim):
+        """A Simulation that can restore sim's snapshots (same rules, bodies and collision)"""
+        scratch = self.scratch
+        if (scratch is None or scratch.rules is not sim.rules or scratch.difficulty is not sim.difficulty or
+                scratch.pipe_factory != sim.pipe_factory or scratch.pipe_release != sim.pipe_release or
+                scratch.narrow_phase is not sim.narrow_phase):
+            if scratch is not None:
+                scratch.clear_pipes()
+            # A shallow copy shares any sprite the airplane holds instead of copying it
+            scratch = self.scratch = Simulation(sim.rules, random.Random(), copy.copy(sim.airplane),
+                                                sim.pipe_factory, difficulty=sim.difficulty,
+                                                narrow_phase=sim.narrow_phase, pipe_release=sim.pipe_release)
+        return scratch
+
+    def search(self, scratch, action, remaining):
+        """Ticks survived (up to remaining) by playing action, then the best continuation"""
+        self.budget -= 1
+        self.rollouts += 1
+        ticks = min(self.decision_ticks, remaining)
+        step = scratch.step
+        for i in range(ticks):
+            step(action and i == 0)
+            if scratch.over:
+                return i
+        remaining -= ticks
+        if remaining == 0 or self.budget <= 0:
+            return ticks + remaining  # Out of budget: assume the rest of the plan works out
+        node = scratch.snapshot()
+        first = gap_follower(scratch)
+        best = 0
+        for child_action in (first, not first):
+            scratch.restore(node)
+            survived = self.search(scratch, child_action, remaining)
+            if survived >= remaining:
+                return ticks + survived
+            best = max(best, survived)
+            if self.budget <= 0:
+                break
+        return ticks + best
+
+
+def benchmark(steps=500000, seed=0):
+    """Return simulation steps per second with the gap-following policy"""
+    sim = Simulation(rng=random.Random(seed))
+    start = time.perf_counter()
+    for _ in range(steps):
+        if sim.over:
+            sim = Simulation(rng=sim.rng)
+        sim.step(gap_follower(sim))
+    return steps / (time.perf_counter() - start)
+
+
+def rollout_benchmark(rollouts=20000, horizon=PILOT_HORIZON, seed=0):
+    """Return (snapshot us, restore us, rollouts/s) for horizon-tick gap-follower rollouts.
+
+    The rollouts start mid-game, each from a restore() of the same snapshot.
+    """
+    sim = Simulation(rng=random.Random(seed))
+    while sim.score < 3:
+        sim.step(gap_follower(sim))
+    root = sim.snapshot()
+
+    start = time.perf_counter()
+    for _ in range(rollouts):
+        sim.rng_state = None  # Time the full copy, as right after a pipe spawns
+        sim.snapshot()
+    snapshot_us = (time.perf_counter() - start) / rollouts * 1e6
+    other = Simulation(rng=random.Random())
+    start = time.perf_counter()
+    for _ in range(rollouts):
+        other.rng_state = None
+        other.restore(root)
+    restore_us = (time.perf_counter() - start) / rollouts * 1e6
+
+    start = time.perf_counter()
+    for _ in range(rollouts):
+        sim.restore(root)
+        for _ in range(horizon):
+            sim.step(gap_follower(sim))
+            if sim.over:
+                break
+    return snapshot_us, restore_us, rollouts / (time.perf_counter() - start)
+
+
+def pilot_benchmark(ticks=6000, seed=0):
+    """Return (pilot decisions/s, score, crashed) for one game flown by LookaheadPilot"""
+    sim = Simulation(rng=random.Random(seed))
+    pilot = LookaheadPilot()
+    start = time.perf_counter()
+    while not sim.over and sim.tick < ticks:
+        sim.step(pilot(sim))
+    return sim.frame / (time.perf_counter() - start), sim.score, sim.over
+
+
+if __name__ == "__main__":
+    steps = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    print(f"[INFO] {benchmark(steps):,.0f} simulation steps/s")
+    snapshot_us, restore_us, rollouts = rollout_benchmark()
+    print(f"[INFO] snapshot {snapshot_us:.1f} us, restore {restore_us:.1f} us (full rng copy)")
+    print(f"[INFO] {rollouts:,.0f} rollouts/s of {PILOT_HORIZON} ticks")
+    decisions, score, crashed = pilot_benchmark()
+    print(f"[INFO] Lookahead pilot: {decisions:,.0f} decisions/s, score {score}"
+          f"{' (crashed)' if crashed else ''}")
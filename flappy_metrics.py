@@ -0,0 +1,193 @@
+"""Prometheus metrics for Flappy Osama kiosks.
+
+The game loop records frames, state changes and finished games into a
+MetricsExporter (cheap, lock-protected counters). A background thread
+publishes them in the Prometheus text format, either over HTTP on a
+localhost port or by periodically rewriting a file for node_exporter's
+textfile collector. Nothing here blocks the game loop.
+"""
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Frame-time histogram buckets in seconds (60 Hz budget is ~0.0167)
+FRAME_BUCKETS = (0.004, 0.008, 0.0125, 0.0167, 0.02, 0.025, 0.0333, 0.05, 0.1, 0.25)
+SCORE_BUCKETS = (0, 1, 2, 5, 10, 20, 30, 50, 75, 100)
+BUDGET_SLACK = 1.5  # A frame counts as over budget past 1.5x the frame-cap interval
+
+
+class MetricsExporter:
+    """Thread-safe game metrics rendered as Prometheus text"""
+    def __init__(self, states, port=None, path=None, interval=15.0):
+        self.states = list(states)
+        self.port = port
+        self.path = path
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.server = None
+        self.started_at = time.time()
+
+        self.state = self.states[0]
+        self.fps = 0.0
+        self.frame_buckets = [0] * len(FRAME_BUCKETS)
+        self.frame_count = 0
+        self.frame_sum = 0.0
+        self.frames_over_budget = 0
+        self.games_played = 0
+        self.last_score = 0
+        self.high_score = 0
+        self.score_buckets = [0] * len(SCORE_BUCKETS)
+        self.score_sum = 0
+        self.sfx_counts = {}  # ChannelPool.counts, updated in place by the game
+
+    def start(self):
+        """Start publishing on background threads"""
+        if self.port is not None:
+            exporter = self
+
+            class Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path not in ("/", "/metrics"):
+                        self.send_error(404)
+                        return
+                    body = exporter.render().encode()
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, format, *args):
+                    pass
+
+            try:
+                self.server = ThreadingHTTPServer(("127.0.0.1", self.port), Handler)
+            except OSError as e:
+                # A taken port must not keep the kiosk from starting
+                print(f"[ERROR] Could not serve metrics on port {self.port}: {e}")
+                print("  Continuing without the metrics HTTP endpoint")
+            else:
+                self.server.daemon_threads = True
+                threading.Thread(target=self.server.serve_forever, name="metrics-http", daemon=True).start()
+                print(f"[OK] Serving metrics on http://127.0.0.1:{self.server.server_address[1]}/metrics")
+        if self.path is not None:
+            threading.Thread(target=self.write_loop, name="metrics-file", daemon=True).start()
+            print(f"[OK] Writing metrics to {self.path} every {self.interval:g}s")
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+        if self.path is not None:
+            self.write_file()
+
+    def write_loop(self):
+        while True:
+            self.write_file()
+            time.sleep(self.interval)
+
+    def write_file(self):
+        # Write then rename so collectors never read a half-written file
+        temp_path = f"{self.path}.tmp"
+        try:
+            with open(temp_path, 'w') as f:
+                f.write(self.render())
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"[ERROR] Could not write metrics file: {e}")
+
+    def set_state(self, state):
+        self.state = state
+
+    def observe_frame(self, frame_ms, fps, budget_ms):
+        """Record one rendered frame's duration (from Game.clock.tick)"""
+        seconds = frame_ms / 1000
+        with self.lock:
+            self.fps = fps
+            self.frame_count += 1
+            self.frame_sum += seconds
+            if frame_ms > budget_ms * BUDGET_SLACK:
+                self.frames_over_budget += 1
+            for i, bound in enumerate(FRAME_BUCKETS):
+                if seconds <= bound:
+                    self.frame_buckets[i] += 1
+                    break
+
+    def game_finished(self, score, high_score):
+        with self.lock:
+            self.games_played += 1
+            self.last_score = score
+            self.high_score = high_score
+            self.score_sum += score
+            for i, bound in enumerate(SCORE_BUCKETS):
+                if score <= bound:
+                    self.score_buckets[i] += 1
+                    break
+
+    def render(self):
+        """Current metrics in the Prometheus text exposition format"""
+        with self.lock:
+            frame_buckets = list(self.frame_buckets)
+            frame_count, frame_sum = self.frame_count, self.frame_sum
+            score_buckets = list(self.score_buckets)
+            games, score_sum = self.games_played, self.score_sum
+            fps, over_budget = self.fps, self.frames_over_budget
+            last_score, high_score = self.last_score, self.high_score
+        lines = [
+            "# HELP flappy_fps Frames per second averaged by pygame.time.Clock.",
+            "# TYPE flappy_fps gauge",
+            f"flappy_fps {fps:.2f}",
+        ]
+        lines += histogram("flappy_frame_seconds", "Time between rendered gameplay frames.",
+                           FRAME_BUCKETS, frame_buckets, frame_sum, frame_count)
+        lines += [
+            "# HELP flappy_frames_over_budget_total Gameplay frames slower than 1.5x the frame-cap interval.",
+            "# TYPE flappy_frames_over_budget_total counter",
+            f"flappy_frames_over_budget_total {over_budget}",
+            "# HELP flappy_state Current game state (1 for the active state).",
+            "# TYPE flappy_state gauge",
+        ]
+        lines += [f'flappy_state{{state="{state}"}} {int(state == self.state)}' for state in self.states]
+        lines += [
+            "# HELP flappy_games_played_total Games finished since start.",
+            "# TYPE flappy_games_played_total counter",
+            f"flappy_games_played_total {games}",
+            "# HELP flappy_last_score Score of the most recent game.",
+            "# TYPE flappy_last_score gauge",
+            f"flappy_last_score {last_score}",
+            "# HELP flappy_high_score Saved high score.",
+            "# TYPE flappy_high_score gauge",
+            f"flappy_high_score {high_score}",
+        ]
+        lines += histogram("flappy_score", "Final scores of finished games.",
+                           SCORE_BUCKETS, score_buckets, score_sum, games)
+        sfx = {category: dict(counts) for category, counts in list(self.sfx_counts.items())}
+        if sfx:
+            lines += [
+                "# HELP flappy_sfx_total Sound effect requests by category and outcome "
+                "(played, limited = restarted own voice, stole, stolen, dropped).",
+                "# TYPE flappy_sfx_total counter",
+            ]
+            lines += [f'flappy_sfx_total{{category="{category}",outcome="{outcome}"}} {count}'
+                      for category, counts in sfx.items() for outcome, count in counts.items()]
+        lines += [
+            "# HELP flappy_uptime_seconds Seconds since the game started.",
+            "# TYPE flappy_uptime_seconds gauge",
+            f"flappy_uptime_seconds {time.time() - self.started_at:.0f}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+def histogram(name, help_text, bounds, counts, total, count):
+    """Prometheus histogram lines from per-bucket (non-cumulative) counts"""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    cumulative = 0
+    for bound, bucket_count in zip(bounds, counts):
+        cumulative += bucket_count
+        lines.append(f'{name}_bucket{{le="{bound:g}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{le="+Inf"}} {count}')
+    lines.append(f"{name}_sum {total:g}")
+    lines.append(f"{name}_count {count}")
+    return lines
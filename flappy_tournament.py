@@ -0,0 +1,215 @@
+"""Headless tournaments between Flappy Osama flap policies.
+
+Every (policy, seed) pair is one game of flappy_core.Simulation, the same
+rules Game.update runs, played on a pool of worker processes. Results
+stream back as they finish and are appended to a JSON Lines file, one
+game per line, so an interrupted tournament picks up where it stopped:
+
+    python flappy_tournament.py gap_follower my_bots:cautious --seeds 1000
+
+A policy is a function policy(sim) -> bool (True = flap) like
+flappy_core.gap_follower. Built-in policies are named directly; others
+are given as module:function and imported in each worker, so a learned
+policy can load its weights once per process at import time.
+"""
+import argparse
+import importlib
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+
+import flappy_core
+from flappy_core import TICK_RATE, Rules, Simulation
+
+RESULTS_FILE = "tournament.jsonl"
+DIFFICULTY_FILE = "difficulty.json"  # Same default as the game
+MAX_TICKS = 10 * 60 * TICK_RATE  # Games still alive after 10 minutes end as "timeout"
+DEATH_TIMEOUT = "timeout"
+
+BUILTIN_POLICIES = {
+    "gap_follower": flappy_core.gap_follower,
+    "lookahead": flappy_core.LookaheadPilot(),
+}
+
+
+def resolve_policy(spec):
+    """The policy function for a built-in name or a module:function spec"""
+    policy = BUILTIN_POLICIES.get(spec)
+    if policy is not None:
+        return policy
+    module_name, _, function_name = spec.partition(":")
+    if not function_name:
+        raise ValueError(f"unknown policy '{spec}' (built-ins: {', '.join(BUILTIN_POLICIES)}; "
+                         f"others are module:function)")
+    policy = getattr(importlib.import_module(module_name), function_name, None)
+    if not callable(policy):
+        raise ValueError(f"{spec} is not a function")
+    return policy
+
+
+# Per-worker state, set up once by init_worker
+_worker = {}
+
+
+def init_worker(policy_specs, difficulty_config, max_ticks):
+    rules = Rules()
+    _worker["rules"] = rules
+    _worker["difficulty"] = flappy_core.Difficulty(difficulty_config, rules)
+    _worker["policies"] = {spec: resolve_policy(spec) for spec in policy_specs}
+    _worker["max_ticks"] = max_ticks
+
+
+def play(job):
+    """Play one (policy, seed) game headless; returns its result record"""
+    spec, seed = job
+    policy = _worker["policies"][spec]
+    max_ticks = _worker["max_ticks"]
+    sim = Simulation(_worker["rules"], rng=random.Random(seed), difficulty=_worker["difficulty"])
+    step = sim.step
+    while not sim.over and sim.tick < max_ticks:
+        step(policy(sim))
+    return {"policy": spec, "seed": seed, "score": sim.score, "ticks": sim.tick,
+            "cause": sim.death_cause if sim.over else DEATH_TIMEOUT}
+
+
+def load_results(path, settings):
+    """Finished games from an earlier run of the same tournament"""
+    results = []
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        return results
+    if data and not data.endswith(b"\n"):
+        # Drop the last line, cut off by an interrupted write, so appending starts cleanly
+        data = data[:data.rfind(b"\n") + 1]
+        os.truncate(path, len(data))
+        print(f"[WARNING] Dropped an incomplete last line from {path}")
+    for number, line in enumerate(data.decode().splitlines(), 1):
+        try:
+            record = json.loads(line)
+        except ValueError:
+            raise ValueError(f"{path}:{number} is not valid JSON")
+        if "settings" in record:
+            if record["settings"] != settings:
+                raise ValueError(f"{path} holds a tournament with different rules or limits")
+        else:
+            results.append(record)
+    return results
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def summarize(results):
+    """Per-policy score and survival distributions plus causes of death"""
+    by_policy = defaultdict(list)
+    for record in results:
+        by_policy[record["policy"]].append(record)
+    summary = {}
+    for policy, records in by_policy.items():
+        scores = sorted(record["score"] for record in records)
+        ticks = sorted(record["ticks"] for record in records)
+        causes = Counter(record["cause"] for record in records)
+        summary[policy] = {
+            "games": len(records),
+            "mean_score": sum(scores) / len(scores),
+            "p10_score": percentile(scores, 0.10),
+            "p50_score": percentile(scores, 0.50),
+            "p90_score": percentile(scores, 0.90),
+            "max_score": scores[-1],
+            "mean_ticks": sum(ticks) / len(ticks),
+            "p50_ticks": percentile(ticks, 0.50),
+            "causes": {cause: count / len(records) for cause, count in causes.most_common()},
+        }
+    return summary
+
+
+def print_summary(summary):
+    print(f"[INFO] {'policy':<24} {'games':>6} {'mean':>7} {'p10':>5} {'p50':>5} {'p90':>5} {'max':>5} "
+          f"{'p50 ticks':>9}  deaths")
+    for policy, stats in sorted(summary.items(), key=lambda item: -item[1]["mean_score"]):
+        causes = ", ".join(f"{cause} {share:.0%}" for cause, share in stats["causes"].items())
+        print(f"[INFO] {policy:<24} {stats['games']:>6} {stats['mean_score']:>7.2f} {stats['p10_score']:>5} "
+              f"{stats['p50_score']:>5} {stats['p90_score']:>5} {stats['max_score']:>5} "
+              f"{stats['p50_ticks']:>9}  {causes}")
+
+
+def run_tournament(policy_specs, seeds, path=RESULTS_FILE, workers=None, difficulty_config=None,
+                   max_ticks=MAX_TICKS):
+    """Play every missing (policy, seed) game, appending results to path; returns all results"""
+    for spec in policy_specs:
+        resolve_policy(spec)  # Fail before starting any workers
+    settings = {"rules": list(flappy_core.rules_to_tuple(Rules())), "difficulty": difficulty_config,
+                "max_ticks": max_ticks}
+    results = load_results(path, settings)
+    done = {(record["policy"], record["seed"]) for record in results}
+    # Interleave policies so a partial run still compares them on the same seeds
+    jobs = [(spec, seed) for seed in seeds for spec in policy_specs if (spec, seed) not in done]
+    if done:
+        print(f"[INFO] Resuming {path}: {len(done)} games done, {len(jobs)} to play")
+    if not jobs:
+        return results
+
+    workers = workers or os.cpu_count() or 1
+    # Big enough chunks to keep inter-process traffic small, small enough to balance the load
+    chunksize = max(1, min(64, len(jobs) // (workers * 16)))
+    start = time.perf_counter()
+    played = ticks = 0
+    report_every = max(1, len(jobs) // 10)
+    with open(path, 'a') as f:
+        if f.tell() == 0:
+            f.write(json.dumps({"settings": settings}) + "\n")
+        with multiprocessing.Pool(workers, init_worker, (policy_specs, difficulty_config, max_ticks)) as pool:
+            for record in pool.imap_unordered(play, jobs, chunksize):
+                f.write(json.dumps(record) + "\n")
+                f.flush()
+                results.append(record)
+                played += 1
+                ticks += record["ticks"]
+                if played % report_every == 0 or played == len(jobs):
+                    elapsed = time.perf_counter() - start
+                    print(f"[INFO] {played}/{len(jobs)} games  {played / elapsed:,.0f} games/s  "
+                          f"{ticks / elapsed:,.0f} ticks/s on {workers} worker(s)")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Flappy Osama policy tournament")
+    parser.add_argument("policies", nargs="+",
+                        help=f"policies to play: {', '.join(BUILTIN_POLICIES)} or module:function")
+    parser.add_argument("--seeds", type=int, default=100, help="games per policy (default 100)")
+    parser.add_argument("--first-seed", type=int, default=0, help="seed of the first game (default 0)")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--results", default=RESULTS_FILE,
+                        help=f"JSON Lines file results are appended to and resumed from (default {RESULTS_FILE})")
+    parser.add_argument("--difficulty", metavar="FILE",
+                        help=f"difficulty curves JSON (default {DIFFICULTY_FILE} if present)")
+    parser.add_argument("--max-ticks", type=int, default=MAX_TICKS,
+                        help=f"end games still alive after this many ticks (default {MAX_TICKS})")
+    args = parser.parse_args()
+
+    try:
+        difficulty_path = args.difficulty
+        if difficulty_path is None and os.path.exists(DIFFICULTY_FILE):
+            difficulty_path = DIFFICULTY_FILE
+        difficulty_config = flappy_core.load_difficulty(difficulty_path) if difficulty_path else None
+        seeds = range(args.first_seed, args.first_seed + args.seeds)
+        results = run_tournament(args.policies, seeds, args.results, args.workers, difficulty_config,
+                                 args.max_ticks)
+    except (OSError, ValueError, ImportError) as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
+    wanted = set(args.policies)
+    print_summary(summarize([record for record in results if record["policy"] in wanted]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""Batched Flappy Osama environments for training flap policies.
+
+VecEnv steps N games in lockstep with the airplane and pipe state of
+every game held in NumPy arrays. Physics, difficulty curves, spawning
+and collision follow flappy_core.Simulation exactly (same float
+operations, same pygame.Rect truncation). Each game starts as soon as
+it is reset, as if the player had already flapped once to begin: the
+first step always climbs, like Simulation's starting flap.
+Finished games reset automatically.
+
+Run `python flappy_vecenv.py` to benchmark steps per second.
+"""
+import sys
+import time
+
+import numpy as np
+
+from flappy_core import SCREEN_WIDTH, SCREEN_HEIGHT, TICK_RATE, Difficulty, Rules, default_difficulty
+
+AIRPLANE_X = 100
+AIRPLANE_WIDTH = 40
+AIRPLANE_HEIGHT = 24
+CURVE_TABLE_SIZE = 1000  # Scores past this evaluate the curve tails, as Difficulty.lookup does
+
+# Observation columns
+OBS_Y, OBS_VELOCITY, OBS_PIPE_DX, OBS_GAP_TOP, OBS_GAP_BOTTOM = range(5)
+
+
+class VecEnv:
+    """N games stepped together with a gym-like reset/step API.
+
+    step(actions) takes a bool array (True = flap) and returns
+    (observations, rewards, dones, info). The reward is the number of
+    pipes passed on that step. info["final_score"] holds each finished
+    game's score (-1 for games still running). The observations of
+    finished games are already those of the fresh game that replaced them.
+    """
+    def __init__(self, num_envs, rules=None, seed=None, difficulty_config=None):
+        self.num_envs = num_envs
+        self.rules = rules if rules is not None else Rules()
+        if difficulty_config is not None:
+            difficulty = Difficulty(difficulty_config, self.rules, CURVE_TABLE_SIZE)
+        else:
+            difficulty = default_difficulty(self.rules)
+        self.rng = np.random.default_rng(seed)
+        self.pipe_width = self.rules.pipe_width
+
+        # Difficulty curves as lookup tables indexed by score, with the tails for higher scores
+        self.tables = {
+            "velocity": np.array(difficulty.tables["velocity"][:CURVE_TABLE_SIZE], dtype=np.float64),
+            "gap": np.array(difficulty.tables["gap"][:CURVE_TABLE_SIZE], dtype=np.int64),
+            "spawn_time": np.array(difficulty.tables["spawn_time"][:CURVE_TABLE_SIZE], dtype=np.int64),
+        }
+        self.tails = {name: difficulty.curves[name][1] for name in self.tables}
+
+        # Enough pipe slots for the slowest pipes at the fastest spawn rate
+        slowest = self.curve_floor("velocity")
+        min_spawn_ticks = int(self.curve_floor("spawn_time")) * TICK_RATE // 1000
+        self.max_pipes = int((SCREEN_WIDTH + self.pipe_width) / slowest / max(1, min_spawn_ticks)) + 2
+
+        n, k = num_envs, self.max_pipes
+        self.y = np.zeros(n)
+        self.velocity = np.zeros(n)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.tick = np.zeros(n, dtype=np.int64)
+        self.last_spawn_tick = np.zeros(n, dtype=np.int64)
+        self.pipe_x = np.zeros((n, k))
+        self.pipe_velocity = np.zeros((n, k))
+        self.pipe_height = np.zeros((n, k), dtype=np.int64)
+        self.pipe_gap = np.zeros((n, k), dtype=np.int64)
+        self.pipe_passed = np.zeros((n, k), dtype=bool)
+        self.pipe_active = np.zeros((n, k), dtype=bool)
+        self.rows = np.arange(n)
+
+    def curve(self, name, score):
+        """Curve values for an array of scores (Difficulty.lookup, vectorized)"""
+        table = self.tables[name]
+        values = table[np.minimum(score, len(table) - 1)]
+        beyond = score >= len(table)
+        if beyond.any():
+            tail = self.tails[name]
+            value = tail["base"] + (score[beyond] - tail["start"]) // tail["every"] * tail["step"]
+            limit = tail.get("limit")
+            if limit is not None:
+                value = np.minimum(value, limit) if tail["step"] > 0 else np.maximum(value, limit)
+            values[beyond] = value
+        return values
+
+    def curve_floor(self, name):
+        """Lowest value a curve takes at any score"""
+        tail = self.tails[name]
+        floor = self.tables[name].min()
+        if tail["step"] < 0:
+            floor = min(floor, tail["limit"])
+        return floor
+
+    def reset(self):
+        self._reset_envs(np.ones(self.num_envs, dtype=bool))
+        return self.observe()
+
+    def _reset_envs(self, mask):
+        self.y[mask] = SCREEN_HEIGHT // 2
+        self.velocity[mask] = self.rules.flap_strength  # The flap that starts the game
+        self.score[mask] = 0
+        self.tick[mask] = 0
+        self.last_spawn_tick[mask] = -1  # No pipe yet: spawn on the first tick
+        self.pipe_active[mask] = False
+        self.pipe_passed[mask] = False
+
+    def step(self, actions):
+        rules = self.rules
+        width = self.pipe_width
+        active = self.pipe_active
+        actions = np.asarray(actions, dtype=bool)
+
+        self.velocity[actions] = rules.flap_strength
+        self.pipe_x -= np.where(active, self.pipe_velocity, 0.0)
+
+        self.tick += 1
+        self.velocity += rules.gravity
+        self.y += self.velocity
+        crashed = (self.y < 0) | (self.y > SCREEN_HEIGHT)
+
+        # Rect collision, truncated like pygame.Rect
+        left = AIRPLANE_X - AIRPLANE_WIDTH // 2
+        right = left + AIRPLANE_WIDTH
+        top = np.trunc(self.y - AIRPLANE_HEIGHT // 2).astype(np.int64)[:, None]
+        bottom = top + AIRPLANE_HEIGHT
+        pipe_x = np.trunc(self.pipe_x).astype(np.int64)
+        bottom_y = self.pipe_height + self.pipe_gap
+        overlap_x = (right > pipe_x) & (left < pipe_x + width)
+        hit_top = (top < self.pipe_height) & (bottom > 0)
+        hit_bottom = (top < SCREEN_HEIGHT) & (bottom > bottom_y) & (bottom_y < SCREEN_HEIGHT)
+        crashed |= (active & overlap_x & (hit_top | hit_bottom)).any(axis=1)
+
+        # Scoring still counts on the crash tick, as in Simulation.step
+        newly_passed = active & ~self.pipe_passed & (self.pipe_x + width < AIRPLANE_X)
+        self.pipe_passed |= newly_passed
+        rewards = newly_passed.sum(axis=1)
+        self.score += rewards
+
+        # Remove off-screen pipes
+        active &= ~(self.pipe_x < -width)
+
+        # Spawn new pipes with current difficulty
+        spawn_time = self.curve("spawn_time", self.score)
+        spawn = (self.last_spawn_tick < 0) | ((self.tick - self.last_spawn_tick) * 1000 > spawn_time * TICK_RATE)
+        if spawn.any():
+            envs = self.rows[spawn]
+            slots = np.argmin(active[envs], axis=1)  # First free slot
+            if active[envs, slots].any():
+                raise RuntimeError("VecEnv ran out of pipe slots")
+            gap = self.curve("gap", self.score[envs])
+            max_height = SCREEN_HEIGHT - gap - 100
+            max_height = np.where(max_height <= 100, 150, max_height)
+            self.pipe_x[envs, slots] = SCREEN_WIDTH
+            self.pipe_velocity[envs, slots] = self.curve("velocity", self.score[envs])
+            self.pipe_gap[envs, slots] = gap
+            self.pipe_height[envs, slots] = self.rng.integers(100, max_height + 1)
+            self.pipe_passed[envs, slots] = False
+            active[envs, slots] = True
+            self.last_spawn_tick[spawn] = self.tick[spawn]
+
+        final_score = np.where(crashed, self.score, -1)
+        if crashed.any():
+            self._reset_envs(crashed)
+        return self.observe(), rewards, crashed, {"final_score": final_score}
+
+    def observe(self):
+        """(N, 5) float32 array of y, velocity, next pipe dx, gap top, gap bottom"""
+        obs = np.empty((self.num_envs, 5), dtype=np.float32)
+        obs[:, OBS_Y] = self.y
+        obs[:, OBS_VELOCITY] = self.velocity
+
+        # Next pipe: the nearest pipe not yet passed (Simulation.next_pipe)
+        candidates = self.pipe_active & ~self.pipe_passed
+        slot = np.argmin(np.where(candidates, self.pipe_x, np.inf), axis=1)
+        has_pipe = candidates[self.rows, slot]
+        height = self.pipe_height[self.rows, slot]
+        obs[:, OBS_PIPE_DX] = np.where(has_pipe, self.pipe_x[self.rows, slot] - AIRPLANE_X, SCREEN_WIDTH)
+        obs[:, OBS_GAP_TOP] = np.where(has_pipe, height, 0)
+        obs[:, OBS_GAP_BOTTOM] = np.where(has_pipe, height + self.pipe_gap[self.rows, slot], SCREEN_HEIGHT)
+        return obs
+
+
+def gap_follower(obs):
+    """Batched version of flappy_core.gap_follower"""
+    gap_top = obs[:, OBS_GAP_TOP]
+    target = gap_top + (obs[:, OBS_GAP_BOTTOM] - gap_top) * 0.6
+    return (obs[:, OBS_VELOCITY] > 0) & (obs[:, OBS_Y] > target)
+
+
+def benchmark(num_envs, steps):
+    """Return environment steps per second (games x ticks) for a batch size"""
+    env = VecEnv(num_envs, seed=0)
+    obs = env.reset()
+    start = time.perf_counter()
+    for _ in range(steps):
+        obs, _, _, _ = env.step(gap_follower(obs))
+    return num_envs * steps / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    steps = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    for num_envs in (1, 64, 4096):
+        print(f"[INFO] N={num_envs:5d}: {benchmark(num_envs, steps):,.0f} env steps/s")